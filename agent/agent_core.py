@@ -1,16 +1,18 @@
 import re
 from agent import memory_manager
+from agent.intent import IntentClassifier
 
 TASK_KEYWORDS = r"(add|create|buy|get|call|email|send|pay|remember|task|todo)"
 EVENT_KEYWORDS = r"(meet|appointment|event|schedule|birthday|remind|plan|attend|conference)"
 
+KEYWORD_CLASSIFIER = IntentClassifier(
+    [("task", [TASK_KEYWORDS]), ("event", [EVENT_KEYWORDS])],
+    flags=re.IGNORECASE
+)
+
 def detect_intent(user_input):
     """Detect intent based on regex keywords."""
-    if re.search(TASK_KEYWORDS, user_input, re.IGNORECASE):
-        return "task"
-    elif re.search(EVENT_KEYWORDS, user_input, re.IGNORECASE):
-        return "event"
-    return "chat"
+    return KEYWORD_CLASSIFIER.classify(user_input).intent
 
 def add_item(text, category, source="regex"):
     """Add task/event to memory (connected with memory_manager)."""
@@ -1,24 +1,95 @@
 from fastapi import WebSocket
 import asyncio
+import json
+from agent import bus
 
-connected_clients = []
+# Per-connection send buffer. When it is full the oldest pending notification
+# is dropped to make room (newest wins), so a slow reader only ever costs its
+# own backlog. A send that blocks for SEND_TIMEOUT seconds drops the client.
+CLIENT_QUEUE_SIZE = 32
+SEND_TIMEOUT = 10
+
+# WebSocket -> ClientConnection (a dict doubles as an ordered set: O(1) add/remove)
+connected_clients = {}
+
+
+class ClientConnection:
+    """One connected socket with its bounded queue and writer task."""
+
+    def __init__(self, ws: WebSocket):
+        self.ws = ws
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+        self.writer = asyncio.create_task(self._drain())
+
+    def offer(self, text):
+        """Queue a serialized message without waiting, coalescing on overflow."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(text)
+
+    async def _drain(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.ws.send_text(text), SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out: the socket is gone or too slow.
+            connected_clients.pop(self.ws, None)
+            try:
+                await self.ws.close(code=1013)  # "try again later"
+            except Exception:
+                pass
 
 
 async def add_client(ws: WebSocket):
     """Register a new connected WebSocket client."""
-    connected_clients.append(ws)
+    if ws not in connected_clients:
+        connected_clients[ws] = ClientConnection(ws)
 
 
 async def remove_client(ws: WebSocket):
     """Remove disconnected WebSocket client."""
-    if ws in connected_clients:
-        connected_clients.remove(ws)
+    conn = connected_clients.pop(ws, None)
+    if conn is not None:
+        conn.writer.cancel()
+
+
+def deliver_local(text):
+    """
+    Queue a serialized notification for every client of this process. Each
+    client's writer task sends it independently, so a slow socket never
+    delays the others. Returns the number of clients queued.
+    """
+    clients = list(connected_clients.values())
+    for conn in clients:
+        conn.offer(text)
+    return len(clients)
+
+
+# Pub/sub backbone (agent.bus): LocalBus until start_bus() picks NOTIFY_BUS.
+notification_bus = bus.LocalBus(deliver_local)
+
+
+async def start_bus(backend=None):
+    global notification_bus
+    notification_bus = bus.create_bus(deliver_local, backend)
+    await notification_bus.start()
+    print(f"✅ Notification bus: {notification_bus.backend}")
+
+
+async def stop_bus():
+    await notification_bus.stop()
 
 
 async def broadcast_notification(title: str, message: str):
-    """Send a JSON notification to all connected WebSocket clients."""
-    for ws in connected_clients:
-        try:
-            await ws.send_json({"title": title, "message": message})
-        except Exception:
-            await remove_client(ws)
\ No newline at end of file
+    """
+    Publish a JSON notification to every worker's clients. The payload is
+    serialized once here; each process fans it out with deliver_local().
+    Returns the local client count when delivery was immediate, else None.
+    """
+    text = json.dumps({"title": title, "message": message}, ensure_ascii=False, separators=(",", ":"))
+    return await notification_bus.publish(text)
@@ -0,0 +1,236 @@
+"""
+Pub/sub backbone behind broadcast_notification.
+
+Every process publishes serialized notifications to the bus and delivers
+whatever the bus hands back to its own WebSocket clients.
+
+    LocalBus        single process: publish() delivers straight away
+    UnixSocketBus   several processes on one host: one of them holds a
+                    lock file and runs a tiny broker on a Unix socket that
+                    relays every frame to every connected process,
+                    including the publisher
+
+Frames are newline-delimited JSON: {"text": <client payload>, "ts": <epoch>}.
+If the broker goes away the survivors reconnect and one of them takes the
+lock over; while disconnected, publish() delivers locally only.
+
+    python -m agent.bus    # run a standalone broker on NOTIFY_BUS_SOCKET
+"""
+import asyncio
+import fcntl
+import json
+import os
+import time
+from agent import metrics
+
+NOTIFY_BUS = os.getenv("NOTIFY_BUS", "local").lower()
+NOTIFY_BUS_SOCKET = os.getenv("NOTIFY_BUS_SOCKET", "/tmp/smart-assistant-bus.sock")
+RECONNECT_SECONDS = 0.5
+# A peer whose unsent frames exceed this is too slow to keep up; drop it.
+MAX_PEER_BUFFER = 1024 * 1024
+
+
+class LocalBus:
+    """In-process bus: every publish is delivered to this process only."""
+
+    backend = "local"
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self.counters = {"published": 0, "received": 0, "delivered": 0, "local_fallbacks": 0, "reconnects": 0}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, text):
+        self.counters["published"] += 1
+        self.counters["received"] += 1
+        delivered = self.deliver(text)
+        self.counters["delivered"] += delivered
+        return delivered
+
+    def stats(self):
+        return dict(self.counters, backend=self.backend)
+
+
+class UnixSocketBus(LocalBus):
+    """Cross-process bus over a Unix socket; the lock holder is the broker."""
+
+    backend = "unix"
+
+    def __init__(self, deliver, path=NOTIFY_BUS_SOCKET):
+        super().__init__(deliver)
+        self.path = path
+        self._lock_fd = None
+        self._server = None
+        self._peers = set()
+        self._peer_tasks = set()
+        self._writer = None
+        self._task = None
+        self._connected = None
+
+    # -------- lifecycle --------
+    async def start(self, timeout=5):
+        self._connected = asyncio.Event()
+        self._task = asyncio.create_task(self._maintain())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠ Notification bus not connected after {timeout}s; delivering locally until it is")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._writer:
+            self._writer.close()
+        if self._server:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            # Closed transports hand each peer handler EOF; let them return.
+            await asyncio.gather(*self._peer_tasks, return_exceptions=True)
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)   # releases the flock
+            self._lock_fd = None
+
+    # -------- publishing side --------
+    async def publish(self, text):
+        self.counters["published"] += 1
+        frame = json.dumps({"text": text, "ts": time.time()}, separators=(",", ":")).encode() + b"\n"
+        writer = self._writer
+        if writer is not None:
+            try:
+                writer.write(frame)
+                await writer.drain()
+                return None
+            except (ConnectionError, OSError):
+                pass
+        # Broker unreachable: at least this worker's clients get it.
+        self.counters["local_fallbacks"] += 1
+        delivered = self.deliver(text)
+        self.counters["delivered"] += delivered
+        return delivered
+
+    # -------- subscriber side --------
+    async def _maintain(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await self._try_become_broker()
+                continue
+
+            self._writer = writer
+            self._connected.set()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    self._on_frame(line)
+            except (ConnectionError, OSError):
+                pass
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            self.counters["reconnects"] += 1
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    def _on_frame(self, line):
+        try:
+            frame = json.loads(line)
+        except ValueError:
+            return
+        self.counters["received"] += 1
+        self.counters["delivered"] += self.deliver(frame["text"])
+        metrics.observe("bus_delivery", max(time.time() - frame.get("ts", time.time()), 0.0), self.backend)
+
+    # -------- broker side --------
+    async def _try_become_broker(self):
+        if self._server is None and (self._lock_fd is not None or self._acquire_lock()):
+            try:
+                try:
+                    os.unlink(self.path)   # stale socket left by a dead broker
+                except FileNotFoundError:
+                    pass
+                self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path)
+                print(f"✅ Notification bus broker listening on {self.path} (pid {os.getpid()})")
+                return
+            except OSError as e:
+                print(f"⚠ Could not start notification bus broker: {e}")
+        await asyncio.sleep(RECONNECT_SECONDS)
+
+    def _acquire_lock(self):
+        fd = os.open(self.path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _serve_peer(self, reader, writer):
+        task = asyncio.current_task()
+        self._peers.add(writer)
+        self._peer_tasks.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for peer in list(self._peers):
+                    if peer.transport.get_write_buffer_size() > MAX_PEER_BUFFER:
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(line)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            self._peer_tasks.discard(task)
+            writer.close()
+
+    def stats(self):
+        return dict(
+            super().stats(),
+            connected=self._writer is not None,
+            role="broker" if self._server is not None else "client",
+            peers=len(self._peers) if self._server is not None else None,
+        )
+
+
+BACKENDS = {"local": LocalBus, "unix": UnixSocketBus}
+
+
+def create_bus(deliver, backend=None):
+    backend = (backend or NOTIFY_BUS).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"NOTIFY_BUS must be one of {', '.join(BACKENDS)}, not {backend!r}")
+    return BACKENDS[backend](deliver)
+
+
+async def _run_broker():
+    bus = UnixSocketBus(lambda text: 0)
+    await bus._try_become_broker()
+    if bus._server is None:
+        print(f"⚠ Another broker already holds {bus.path}.lock")
+        return
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_run_broker())
+    except KeyboardInterrupt:
+        pass
@@ -1,44 +1,179 @@
-import dateparser
-from datetime import datetime
-from dateparser.search import search_dates
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from agent import metrics
 
+KOLKATA = ZoneInfo("Asia/Kolkata")
 
-def extract_time(text: str):
+_DATEPARSER_SETTINGS = {
+    "PREFER_DATES_FROM": "future",
+    "TIMEZONE": "Asia/Kolkata",
+    "RETURN_AS_TIMEZONE_AWARE": False,
+}
+
+# ======================================================
+# ⚡ FAST PATH
+# ======================================================
+_WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "wednesday": 2, "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4, "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+_MONTHS = (r"jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august"
+           r"|sep|sept|september|oct|october|nov|november|dec|december")
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                 "six": 6, "ten": 10, "fifteen": 15, "twenty": 20, "thirty": 30, "half an": 0.5}
+_UNITS = {"min": "minutes", "mins": "minutes", "minute": "minutes", "minutes": "minutes",
+          "hr": "hours", "hrs": "hours", "hour": "hours", "hours": "hours",
+          "day": "days", "days": "days", "week": "weeks", "weeks": "weeks"}
+_PARTS_OF_DAY = {"morning": 9, "afternoon": 14, "evening": 18, "night": 20, "tonight": 20}
+
+# Anything that can carry a date. Messages without one of these skip parsing.
+# Bare numbers ("report 3", "buy 2 apples") only count in a time/date shape.
+_TEMPORAL_HINT = re.compile(
+    r"\d:\d|\d\s*[ap]\.?m\b|\d[/.-]\d|\d(?:st|nd|rd|th)\b|\b(?:at|by|on|around)\s+\d"
+    r"|\b(?:today|tonight|tomorrow|tmrw|yesterday|now|noon|midnight|morning|afternoon"
+    r"|evening|night|week|weekend|month|year|hours?|hrs?|minutes?|mins?|ago|days?|fortnight"
+    r"|" + "|".join(_WEEKDAYS) + "|" + _MONTHS + r")\b",
+    re.IGNORECASE,
+)
+# Forms the fast parser does not handle; these always go to dateparser.
+_SLOW_FORMS = re.compile(
+    r"\b(?:" + _MONTHS + r"|yesterday|ago|last|month|months|year|years|weekend|fortnight)\b"
+    r"|\b\d{1,2}(?:st|nd|rd|th)\b|\b\d{1,4}[/.-]\d{1,2}\b",
+    re.IGNORECASE,
+)
+_RELATIVE = re.compile(
+    r"\bin\s+(\d+|half an|an|a|one|two|three|four|five|six|ten|fifteen|twenty|thirty)\s+"
+    r"(mins?|minutes?|hrs?|hours?|days?|weeks?)\b",
+    re.IGNORECASE,
+)
+# Only full weekday names: "sun", "sat", "wed" are too often ordinary words.
+_DAY = re.compile(
+    r"\b(?:(day after tomorrow)|(today|tonight|tomorrow|tmrw)|(next week)"
+    r"|(?:(next|this|on|coming)\s+)?(" + "|".join(k for k in _WEEKDAYS if k.endswith("day")) + r"))\b",
+    re.IGNORECASE,
+)
+_TIME = re.compile(
+    r"\b(?:(noon|midday)\b|(midnight)\b"
+    r"|(at\s+)?(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.?|p\.m\.?)?(?![\w:/-]|\.\d))"
+    r"|\b(morning|afternoon|evening|night)\b",
+    re.IGNORECASE,
+)
+
+
+# A bare hour in these reads as pm: "tonight at 9", "at 7 in the evening"
+_EVENING = re.compile(r"\b(?:tonight|evening|night)\b", re.IGNORECASE)
+
+
+def _find_time(text):
     """
-    Extract and return a datetime object from text using dateparser.
-    Automatically interprets future dates and Indian timezone.
-    Supports phrases like:
-      - "tomorrow at 5pm"
-      - "next monday 9am"
-      - "in 2 hours"
-      - "5th November 3:30pm"
+    (hour, minute) of the time of day in `text`, or None. An explicit time
+    ("at 7", "7:30", "noon") wins over a part of day ("evening"), and a bare
+    hour from 1 to 11 is read as pm when the text is about the evening.
     """
-    if not text or not isinstance(text, str):
+    part = None
+    for m in _TIME.finditer(text):
+        noon, midnight, at, hour, minute, meridiem, part_of_day = m.groups()
+        if part_of_day:
+            part = part or part_of_day.lower()
+            continue
+        if noon:
+            return 12, 0
+        if midnight:
+            return 0, 0
+        # A bare number is only a time with "at", minutes or am/pm ("buy 2 apples")
+        if not (at or minute or meridiem):
+            continue
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem:
+            if hour < 1 or hour > 12:
+                return None
+            if meridiem[0].lower() == "p" and hour != 12:
+                hour += 12
+            elif meridiem[0].lower() == "a" and hour == 12:
+                hour = 0
+        elif 1 <= hour <= 11 and _EVENING.search(text):
+            hour += 12
+        if hour > 23 or minute > 59:
+            return None
+        return hour, minute
+    return (_PARTS_OF_DAY[part], 0) if part else None
+
+
+def _fast_parse(text, now):
+    """
+    Hand-written parser for the common reminder phrasings. Returns a naive
+    Kolkata datetime, or None when the text needs the full dateparser.
+    """
+    rel = _RELATIVE.search(text)
+    if rel:
+        amount, unit = rel.group(1).lower(), _UNITS[rel.group(2).lower()]
+        amount = float(amount) if amount.isdigit() else _NUMBER_WORDS[amount]
+        return now + timedelta(**{unit: amount})
+
+    day = _DAY.search(text)
+    time_of_day = _find_time(text)
+    if day is None and time_of_day is None:
         return None
 
-    # Try direct parsing first
-    parsed_time = dateparser.parse(
-        text,
-        settings={
-            "PREFER_DATES_FROM": "future",
-            "TIMEZONE": "Asia/Kolkata",
-            "RETURN_AS_TIMEZONE_AWARE": False,
-        },
-    )
+    target = now
+    if day is not None:
+        after_tomorrow, word, next_week, qualifier, weekday = day.groups()
+        if after_tomorrow:
+            target = now + timedelta(days=2)
+        elif word:
+            word = word.lower()
+            target = now + timedelta(days=1) if word in ("tomorrow", "tmrw") else now
+            if word == "tonight" and time_of_day is None:
+                time_of_day = (_PARTS_OF_DAY["tonight"], 0)
+        elif next_week:
+            target = now + timedelta(weeks=1)
+        else:
+            ahead = (_WEEKDAYS[weekday.lower()] - now.weekday()) % 7
+            if ahead == 0 and (qualifier or "").lower() == "next":
+                ahead = 7
+            target = (now + timedelta(days=ahead)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if time_of_day is not None:
+        hour, minute = time_of_day
+        target = target.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    # Time only ("at 5pm") or a weekday already past today: prefer the future
+    if target <= now:
+        if day is None:
+            target += timedelta(days=1)
+        elif day.group(5):
+            target += timedelta(weeks=1)
+    return target
+
+
+# ======================================================
+# 🧠 MEMOIZED DATEPARSER FALLBACK
+# ======================================================
+DATE_CACHE_SIZE = 2048
+_date_cache = OrderedDict()
+_date_cache_lock = threading.Lock()
+
+
+def _dateparser_extract(text, base):
+    """The original dateparser path, pinned to `base` so results are cacheable."""
+    # dateparser is slow to import; load it on first use, not at startup
+    import dateparser
+    from dateparser.search import search_dates
+
+    settings = dict(_DATEPARSER_SETTINGS, RELATIVE_BASE=base)
 
+    # Try direct parsing first
+    parsed_time = dateparser.parse(text, settings=settings)
     if parsed_time:
         return parsed_time
 
     # Try searching for date/time expressions inside the text
     try:
-        results = search_dates(
-            text,
-            settings={
-                "PREFER_DATES_FROM": "future",
-                "TIMEZONE": "Asia/Kolkata",
-                "RETURN_AS_TIMEZONE_AWARE": False,
-            },
-        )
+        results = search_dates(text, settings=settings)
         if results:
             # search_dates returns list of tuples [(phrase, datetime)]
             return results[0][1]
@@ -48,10 +183,126 @@ def extract_time(text: str):
     return None
 
 
+def _cached_dateparser_extract(text, now):
+    # Relative phrases depend on "now": key on the reference minute as well,
+    # and pin dateparser to that minute so every hit is exactly reproducible.
+    base = now.replace(second=0, microsecond=0)
+    key = (" ".join(text.lower().split()), base)
+    with _date_cache_lock:
+        if key in _date_cache:
+            _date_cache.move_to_end(key)
+            return _date_cache[key]
+
+    result = _dateparser_extract(text, base)
+
+    with _date_cache_lock:
+        _date_cache[key] = result
+        while len(_date_cache) > DATE_CACHE_SIZE:
+            _date_cache.popitem(last=False)
+    return result
+
+
+def extract_time(text: str, now=None):
+    """
+    Extract and return a datetime object (naive, Asia/Kolkata) from text.
+    Messages with no temporal token return None without parsing; common
+    phrasings are handled by a hand-written fast path:
+      - "tomorrow at 5pm"
+      - "next monday 9am"
+      - "in 2 hours"
+    and everything else (e.g. "5th November 3:30pm") falls back to a
+    memoized dateparser call. `now` overrides the reference time.
+    """
+    start = metrics.clock()
+    parsed_time, source = _extract_time(text, now)
+    metrics.observe("extract_time", metrics.clock() - start, source)
+    return parsed_time
+
+
+def _extract_time(text, now):
+    """Returns (datetime or None, source): "none", "fast" or "dateparser"."""
+    if not text or not isinstance(text, str):
+        return None, "none"
+
+    if now is None:
+        now = datetime.now(KOLKATA).replace(tzinfo=None)
+    elif now.tzinfo is not None:
+        now = now.astimezone(KOLKATA).replace(tzinfo=None)
+
+    if not _TEMPORAL_HINT.search(text):
+        return None, "none"
+
+    if not _SLOW_FORMS.search(text):
+        parsed_time = _fast_parse(text, now)
+        if parsed_time:
+            return parsed_time, "fast"
+
+    return _cached_dateparser_extract(text, now), "dateparser"
+
+
+def upcoming(dt, now=None):
+    """
+    dt if it is still ahead of now, else None: a time that has already
+    passed is never set as a reminder. Naive values are Kolkata time.
+    """
+    if dt is None:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(KOLKATA).replace(tzinfo=None)
+    if now is None:
+        now = datetime.now(KOLKATA).replace(tzinfo=None)
+    return dt if dt > now else None
+
+
 def format_time(dt):
     """
     Convert a datetime object into '%Y-%m-%d %H:%M' formatted string.
     """
     if isinstance(dt, datetime):
         return dt.strftime("%Y-%m-%d %H:%M")
-    return None
\ No newline at end of file
+    return None
+
+
+def _is_stored_format(value):
+    return len(value) == 16 and value[4] == value[7] == "-" and value[10] == " " and value[13] == ":"
+
+
+def normalize_reminder_time(value):
+    """
+    A reminder_time in the stored form: Kolkata '%Y-%m-%d %H:%M', which
+    sorts and compares correctly as a string (the due-reminder queries rely
+    on that). Unparseable values are returned unchanged.
+    """
+    if isinstance(value, str) and _is_stored_format(value):
+        return value
+    due = parse_reminder_time(value)
+    return format_time(due.replace(tzinfo=None)) if due else value
+
+
+def parse_reminder_time(value):
+    """
+    Turn a stored reminder_time into a timezone-aware datetime (Asia/Kolkata).
+    Accepts datetimes, 'YYYY-MM-DD HH:MM' strings and ISO strings; naive
+    values are read as Kolkata local time. Returns None when unparseable.
+    """
+    if isinstance(value, datetime):
+        target = value
+    elif isinstance(value, str):
+        try:
+            if _is_stored_format(value):
+                # The stored format; slicing is ~10x cheaper than strptime.
+                target = datetime(int(value[:4]), int(value[5:7]), int(value[8:10]),
+                                  int(value[11:13]), int(value[14:]))
+            else:
+                target = datetime.strptime(value, "%Y-%m-%d %H:%M")
+        except ValueError:
+            try:
+                target = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+    else:
+        return None
+
+    if target.tzinfo is None:
+        return target.replace(tzinfo=KOLKATA)
+    return target.astimezone(KOLKATA)
@@ -0,0 +1,159 @@
+"""
+The one storage handle every module shares.
+
+Nothing connects at import time. The first collection access resolves the
+backend. For MongoDB that creates a single MongoClient, whose connection
+pool is shared by every thread of the worker. If MongoDB is unreachable in
+auto mode, the embedded SQLite store is used instead.
+
+    collection("tasks")   lazy handle; safe to keep in a module global
+    get_db()              the resolved database (connects on first call)
+    backend()             "mongo" or "sqlite" once resolved
+    ensure_indexes()      idempotent; run once at startup
+"""
+import os
+import threading
+import certifi
+from pymongo import MongoClient
+
+MONGO_URL = os.getenv("MONGO_URL", "")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "smart_assistant")
+
+# auto: MongoDB, or the embedded SQLite store if it is unreachable or MONGO_URL is unset
+# mongo: MongoDB only (fail on first use if it is unreachable)
+# sqlite: always the embedded store at LOCAL_DB_FILE
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "auto").lower()
+LOCAL_DB_FILE = os.getenv("LOCAL_DB_FILE", os.path.join(os.path.dirname(__file__), "memory.sqlite3"))
+
+# Pool and timeouts. One pool per worker process is shared by all threads,
+# so the pool never needs to be larger than the DB executor.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", os.getenv("DB_EXECUTOR_WORKERS", "8")))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "1"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+
+# (collection, keys) for every secondary index the query paths rely on.
+INDEXES = [
+    (section, keys)
+    for section in ("tasks", "events")
+    for keys in (
+        [("id", 1)],                          # targeted updates / deletes / claims
+        [("status", 1)],                      # status filters
+        [("reminder_time", 1)],               # pending and due reminder scans
+        [("created_at", 1), ("id", 1)],       # paginated reads, in page order
+        [("text_norm", 1)],                   # exact-text completion
+        [("claim", 1)],                       # reading back a claim_due_reminders batch
+    )
+]
+
+_client = None
+_db = None
+_backend = None
+_lock = threading.Lock()
+_resolve_lock = threading.Lock()
+
+
+def get_client():
+    """The shared MongoClient (created on first call; does not block on the network)."""
+    global _client
+    with _lock:
+        if _client is None:
+            # Atlas (+srv) URLs imply TLS; verify against certifi's bundle there.
+            tls_options = {"tlsCAFile": certifi.where()} if MONGO_URL.startswith("mongodb+srv://") else {}
+            _client = MongoClient(
+                MONGO_URL,
+                **tls_options,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS or None,
+                retryWrites=True,
+                w="majority",
+            )
+        return _client
+
+
+def get_db():
+    """Resolve the backend once (probing MongoDB if needed) and return the database."""
+    if _db is not None:
+        return _db
+    with _resolve_lock:
+        if _db is None:
+            _resolve()
+        return _db
+
+
+def _resolve():
+    global _db, _backend
+    if STORAGE_BACKEND == "mongo" and not MONGO_URL:
+        raise RuntimeError("STORAGE_BACKEND=mongo needs MONGO_URL")
+    if STORAGE_BACKEND != "sqlite" and MONGO_URL:
+        try:
+            database = get_client()[MONGO_DB_NAME]
+            database.command("ping")
+            print("✅ MongoDB connection successful")
+            _db, _backend = database, "mongo"
+            return
+        except Exception as e:
+            print("⚠️ MongoDB connection failed:", e)
+            if STORAGE_BACKEND == "mongo":
+                raise
+            close()
+
+    from agent.local_store import LocalDatabase
+    _db, _backend = LocalDatabase(LOCAL_DB_FILE), "sqlite"
+    print(f"⚠️ Running in offline mode (local store at {LOCAL_DB_FILE})")
+
+
+def backend():
+    return _backend
+
+
+def stats():
+    return {
+        "backend": _backend,
+        "max_pool_size": MONGO_MAX_POOL_SIZE if _backend == "mongo" else None,
+        "path": LOCAL_DB_FILE if _backend == "sqlite" else None,
+    }
+
+
+class _LazyCollection:
+    """Stands in for get_db()[name]; resolves the backend on first use."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
+
+    def __repr__(self):
+        return f"<collection {self.name!r} ({_backend or 'unresolved'})>"
+
+
+def collection(name):
+    return _LazyCollection(name)
+
+
+def ensure_indexes():
+    """Create the secondary indexes (a no-op for the ones that already exist)."""
+    database = get_db()
+    for section, keys in INDEXES:
+        try:
+            database[section].create_index(keys)
+        except Exception as e:
+            print(f"⚠ Could not create index {keys} on {section}:", e)
+    print(f"✅ {len(INDEXES)} indexes ensured ({_backend})")
+
+
+def close():
+    global _client, _db, _backend
+    with _lock:
+        if _client is not None:
+            _client.close()
+        elif _db is not None and hasattr(_db, "close"):
+            _db.close()
+        _client = _db = _backend = None
@@ -0,0 +1,46 @@
+import re
+from collections import namedtuple
+
+# intent: winning label, rule: "<intent>_<n>" index into that intent's
+# pattern list (None for the default), span: (start, end) of the match.
+IntentMatch = namedtuple("IntentMatch", ["intent", "rule", "span"])
+
+
+class IntentClassifier:
+    """
+    Single-pass regex classifier over ordered (intent, patterns) rules.
+
+    Each intent becomes one lookahead anchored at the start of the text that
+    scans for any of its patterns (one named group per pattern). The regex
+    engine tries the intents left to right and stops at the first that
+    matches, which gives the same answer as looping re.search over each
+    list in priority order, in one precompiled match() call.
+    """
+
+    def __init__(self, rules, flags=0, default="chat"):
+        self.default = default
+        self._rules = {}
+        alternatives = []
+        for intent, patterns in rules:
+            groups = []
+            for i, pattern in enumerate(patterns):
+                name = f"{intent}_{i}"
+                self._rules[name] = intent
+                groups.append(f"(?P<{name}>{pattern})")
+            alternatives.append("(?=(?s:.*?)(?:" + "|".join(groups) + "))")
+        self._regex = re.compile("|".join(alternatives), flags)
+
+    def classify(self, text):
+        """Return an IntentMatch for `text` (default intent when nothing matches)."""
+        match = self._regex.match(text or "")
+        if match is None:
+            return IntentMatch(self.default, None, None)
+        name = match.lastgroup
+        if name not in self._rules:
+            name = next(k for k, v in match.groupdict().items() if v is not None)
+        return IntentMatch(self._rules[name], name, match.span(name))
+
+    def classify_many(self, messages):
+        """Batch variant for bulk imports; same order as `messages`."""
+        classify = self.classify
+        return [classify(message) for message in messages]
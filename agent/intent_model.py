@@ -0,0 +1,282 @@
+"""
+Offline intent model for the messages the regex rules miss.
+
+TF-IDF features (word unigrams and bigrams) feeding a multinomial naive
+Bayes classifier, all in NumPy. It learns from what the app already has
+labels for:
+- every stored task and event, labelled by its collection;
+- every message the regex rules or the LLM classify at runtime (learn());
+- a small seed set, so completions and chat are covered on a fresh store.
+
+predict() returns the winning intent and its probability. decide() returns
+the intent only when that probability reaches INTENT_MODEL_THRESHOLD, so
+uncertain messages still go to the LLM. A single prediction takes tens of
+microseconds; predict_many() scores a whole batch with a few NumPy calls.
+
+    INTENT_MODEL_ENABLED=0       always use the LLM, as before
+    INTENT_MODEL_THRESHOLD=0.9   minimum probability to skip the LLM
+"""
+import math
+import os
+import threading
+from collections import deque
+import numpy as np
+from agent.text_index import tokenize
+
+INTENT_MODEL_ENABLED = os.getenv("INTENT_MODEL_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+INTENT_MODEL_THRESHOLD = float(os.getenv("INTENT_MODEL_THRESHOLD", "0.9"))
+INTENT_MODEL_MAX_FEATURES = int(os.getenv("INTENT_MODEL_MAX_FEATURES", "50000"))
+INTENT_MODEL_MAX_EXAMPLES = int(os.getenv("INTENT_MODEL_MAX_EXAMPLES", "20000"))
+
+LABELS = ("task", "event", "complete", "chat")
+
+# Enough for every class to exist on a fresh install. The store and the
+# runtime labels soon outnumber these.
+SEED_EXAMPLES = [
+    ("pick up the dry cleaning", "task"),
+    ("pay the electricity bill", "task"),
+    ("renew my passport", "task"),
+    ("book a flight tomorrow", "task"),
+    ("water the plants", "task"),
+    ("fix the leaking tap", "task"),
+    ("return the library books", "task"),
+    ("order a new phone charger", "task"),
+    ("dinner with priya on friday", "event"),
+    ("dentist appointment next week", "event"),
+    ("flight to delhi on monday morning", "event"),
+    ("job interview at 11", "event"),
+    ("cousin's wedding in december", "event"),
+    ("doctor visit tomorrow evening", "event"),
+    ("team standup every morning", "event"),
+    ("parent teacher meeting on saturday", "event"),
+    ("paid the electricity bill", "complete"),
+    ("picked up the dry cleaning", "complete"),
+    ("the plants are watered", "complete"),
+    ("already renewed my passport", "complete"),
+    ("fixed the tap", "complete"),
+    ("returned the books", "complete"),
+    ("that one is sorted", "complete"),
+    ("got it taken care of", "complete"),
+    ("hi", "chat"),
+    ("hello there", "chat"),
+    ("good morning", "chat"),
+    ("how are you", "chat"),
+    ("thank you so much", "chat"),
+    ("thanks", "chat"),
+    ("what can you do", "chat"),
+    ("who are you", "chat"),
+    ("tell me a joke", "chat"),
+    ("what is the weather like", "chat"),
+    ("what time is it", "chat"),
+    ("nice to meet you", "chat"),
+    ("ok cool", "chat"),
+    ("bye", "chat"),
+    ("that's great", "chat"),
+    ("can you help me", "chat"),
+]
+
+
+def _terms(text):
+    tokens = tokenize(text)
+    return tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+
+
+class IntentModel:
+    """
+    TF-IDF + multinomial naive Bayes over LABELS, trained from (text, intent)
+    pairs. Examples are kept (up to max_examples, oldest dropped first) and
+    the model is refit from them in one vectorised pass. Refits happen lazily,
+    once enough new examples have arrived (10% of the set, at least 32).
+    Class priors are uniform, because which classes get labelled (mostly
+    regex task/event hits) says little about the messages that reach it.
+    """
+
+    def __init__(self, examples=(), alpha=0.1, max_features=INTENT_MODEL_MAX_FEATURES,
+                 max_examples=INTENT_MODEL_MAX_EXAMPLES):
+        self.alpha = alpha
+        self.max_features = max_features
+        self._vocab = {}                               # term -> column
+        self._examples = deque(maxlen=max_examples)    # ({column: count}, label index)
+        self._unfit = 0
+        self._idf = self._idf_list = None
+        self._log_prob = None                          # (features, labels)
+        self._lock = threading.Lock()
+        self.decided = 0      # messages answered locally
+        self.escalated = 0    # messages left to the LLM
+        self.learn_many(examples)
+
+    def __len__(self):
+        return len(self._examples)
+
+    # Pickled to hand the trained model to process-pool workers
+    def __getstate__(self):
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _columns(self, text, grow):
+        """Term columns and their counts (new terms get columns if grow)."""
+        counts = {}
+        vocab = self._vocab
+        for term in _terms(text):
+            column = vocab.get(term)
+            if column is None:
+                if not grow or len(vocab) >= self.max_features:
+                    continue
+                column = vocab[term] = len(vocab)
+            counts[column] = counts.get(column, 0) + 1
+        return counts
+
+    # -------- training --------
+    def learn(self, text, intent):
+        self.learn_many([(text, intent)])
+
+    def learn_many(self, pairs):
+        with self._lock:
+            for text, intent in pairs:
+                if intent not in LABELS:
+                    continue
+                counts = self._columns(text, grow=True)
+                if counts:
+                    self._examples.append((counts, LABELS.index(intent)))
+                    self._unfit += 1
+
+    def label_counts(self):
+        """Training examples per label."""
+        with self._lock:
+            labels = [label for _, label in self._examples]
+        return {name: labels.count(i) for i, name in enumerate(LABELS)}
+
+    def fit(self):
+        with self._lock:
+            self._fit()
+
+    def _compact(self):
+        """Drop the columns only evicted examples used, once the vocabulary is full."""
+        used = {column for counts, _ in self._examples for column in counts}
+        remap = {}
+        for term, column in self._vocab.items():
+            if column in used:
+                remap[column] = len(remap)
+        self._vocab = {term: remap[column] for term, column in self._vocab.items() if column in remap}
+        self._examples = deque((({remap[c]: n for c, n in counts.items()}, label) for counts, label in self._examples),
+                               maxlen=self._examples.maxlen)
+
+    def _fit(self):
+        self._unfit = 0
+        if not self._examples:
+            self._log_prob = None
+            return
+        if len(self._vocab) >= self.max_features:
+            self._compact()
+        n_features = len(self._vocab)
+        columns, tf, doc, labels = [], [], [], []
+        for i, (counts, label) in enumerate(self._examples):
+            columns.extend(counts)
+            tf.extend(counts.values())
+            doc.extend([i] * len(counts))
+            labels.append(label)
+        columns = np.asarray(columns, dtype=np.int64)
+        doc = np.asarray(doc, dtype=np.int64)
+        labels = np.asarray(labels, dtype=np.int64)
+        n_docs = len(labels)
+
+        # Smoothed idf, sublinear tf, each document L2-normalised
+        df = np.bincount(columns, minlength=n_features)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        weights = (1.0 + np.log(np.asarray(tf, dtype=np.float64))) * idf[columns]
+        norms = np.sqrt(np.bincount(doc, weights=weights * weights, minlength=n_docs))
+        weights /= norms[doc]
+
+        # Per-label feature mass -> smoothed log P(feature | label)
+        mass = np.bincount(columns * len(LABELS) + labels[doc], weights=weights,
+                           minlength=n_features * len(LABELS)).reshape(n_features, len(LABELS))
+        mass += self.alpha
+        self._log_prob = np.log(mass / mass.sum(axis=0))
+        self._idf = idf
+        self._idf_list = idf.tolist()
+
+    def _ready(self):
+        if self._unfit and (self._log_prob is None or self._unfit >= max(32, len(self._examples) // 10)):
+            self._fit()
+        return self._log_prob is not None
+
+    # -------- inference --------
+    def predict(self, text):
+        """(intent, probability), or (None, 0.0) before any training or with no known terms."""
+        with self._lock:
+            if not self._ready():
+                return None, 0.0
+            fitted = len(self._idf)
+            counts = [(c, n) for c, n in self._columns(text, grow=False).items() if c < fitted]
+            if not counts:
+                return None, 0.0
+            # A handful of terms: plain floats are cheaper than more NumPy calls
+            idf = self._idf_list
+            weights = [(1.0 + math.log(n)) * idf[c] for c, n in counts]
+            norm = math.sqrt(sum(w * w for w in weights))
+            scores = np.asarray(weights) @ self._log_prob[[c for c, _ in counts]] / norm
+        scores = [math.exp(v) for v in (scores - scores.max()).tolist()]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return LABELS[best], scores[best] / sum(scores)
+
+    def predict_many(self, texts):
+        """predict() for a batch: one gather and a scatter-add per label for all texts."""
+        with self._lock:
+            if not self._ready():
+                return [(None, 0.0)] * len(texts)
+            columns, tf, doc = [], [], []
+            for i, text in enumerate(texts):
+                counts = self._columns(text, grow=False)
+                columns.extend(counts)
+                tf.extend(counts.values())
+                doc.extend([i] * len(counts))
+            log_prob, idf = self._log_prob, self._idf
+        columns = np.asarray(columns, dtype=np.int64)
+        fitted = columns < len(idf)                   # terms first seen since the last fit
+        columns = columns[fitted]
+        doc = np.asarray(doc, dtype=np.int64)[fitted]
+        weights = (1.0 + np.log(np.asarray(tf, dtype=np.float64)[fitted])) * idf[columns]
+        norms = np.sqrt(np.bincount(doc, weights=weights * weights, minlength=len(texts)))
+        known = norms > 0
+        weights /= norms[doc]
+        contributions = log_prob[columns] * weights[:, None]
+        scores = np.stack([np.bincount(doc, weights=contributions[:, j], minlength=len(texts))
+                           for j in range(len(LABELS))], axis=1)
+        probs = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [(LABELS[b], float(probs[i, b])) if known[i] else (None, 0.0) for i, b in enumerate(best)]
+
+    def decide(self, text, threshold=None):
+        """The predicted intent if it is confident enough to skip the LLM, else None."""
+        return self.decide_many([text], threshold)[0] if INTENT_MODEL_ENABLED else None
+
+    def decide_many(self, texts, threshold=None):
+        if not INTENT_MODEL_ENABLED:
+            return [None] * len(texts)
+        threshold = INTENT_MODEL_THRESHOLD if threshold is None else threshold
+        predictions = [self.predict(texts[0])] if len(texts) == 1 else self.predict_many(texts)
+        decisions = [intent if probability >= threshold else None for intent, probability in predictions]
+        decided = len(decisions) - decisions.count(None)
+        self.decided += decided
+        self.escalated += len(decisions) - decided
+        return decisions
+
+    def stats(self):
+        seen = self.decided + self.escalated
+        return {
+            "enabled": INTENT_MODEL_ENABLED,
+            "threshold": INTENT_MODEL_THRESHOLD,
+            "examples": self.label_counts(),
+            "features": len(self._vocab),
+            "decided": self.decided,
+            "escalated": self.escalated,
+            "llm_calls_avoided": round(self.decided / seen, 4) if seen else 0.0,
+        }
+
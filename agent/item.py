@@ -0,0 +1,121 @@
+"""
+Item: the in-process record for one task or event.
+
+Stored documents and HTTP payloads stay plain dicts. Everything in between
+(snapshot, completion index, reminder scheduler, message pipeline) passes
+Items around. from_doc(), to_doc() and to_json() are the only conversions.
+
+Items are shared between the snapshot, the completion index and the
+scheduler, so treat them as read-only and use replace() to change one.
+"""
+from agent.date_parser_helper import normalize_reminder_time, parse_reminder_time
+from agent.text_index import normalize
+
+# Status values after which a reminder never fires again.
+DONE_STATUSES = ("completed", "notified")
+
+# Stored under these names; everything else a document carries goes to extra.
+_FIELDS = ("id", "text", "text_norm", "status", "source", "created_at", "reminder_time")
+# Legacy spellings folded into the canonical fields on read.
+_LEGACY = ("type", "description", "completed", "_id")
+_KNOWN = frozenset(_FIELDS + _LEGACY)
+# Stored with the item but never part of the API shape: the search key and
+# the reminder claim/lease bookkeeping (the last three are never written by
+# save_memory either; only the claim calls own them).
+INTERNAL_FIELDS = ("text_norm", "claim", "owner", "lease_expires")
+
+
+class Item:
+    __slots__ = _FIELDS + ("type", "due", "extra")
+
+    def __init__(self, type_, text, id=None, status="pending", source=None,
+                 created_at=None, reminder_time=None, extra=None):
+        self.type = type_
+        self.id = id
+        self.text = text
+        self.text_norm = normalize(text)
+        self.status = status
+        self.source = source
+        self.created_at = created_at
+        self._set_reminder(reminder_time)
+        self.extra = extra or None
+
+    def _set_reminder(self, reminder_time):
+        # ISO / UTC-offset / datetime values are stored in the one sortable form
+        reminder_time = normalize_reminder_time(reminder_time) if reminder_time else None
+        self.reminder_time = reminder_time or None
+        # Parsed once here; the scheduler and due checks compare datetimes.
+        self.due = parse_reminder_time(reminder_time) if reminder_time else None
+
+    @property
+    def section(self):
+        return self.type + "s"
+
+    @property
+    def pending(self):
+        """Has a reminder that has not fired (or been completed) yet."""
+        return self.due is not None and self.status not in DONE_STATUSES
+
+    # -------- boundaries --------
+    @classmethod
+    def from_doc(cls, doc, type_=None):
+        """Build from a stored document or a JSON payload (type_ defaults to doc["type"])."""
+        item = cls.__new__(cls)
+        item.type = type_ or doc.get("type")
+        item.id = doc.get("id")
+        item.text = doc.get("text") or doc.get("description") or ""
+        item.text_norm = doc.get("text_norm") or normalize(item.text)
+        item.status = doc.get("status") or ("completed" if doc.get("completed") else "pending")
+        item.source = doc.get("source")
+        item.created_at = doc.get("created_at")
+        item._set_reminder(doc.get("reminder_time"))
+        extra = None
+        for key in doc.keys() - _KNOWN:
+            extra = extra or {}
+            extra[key] = doc[key]
+        item.extra = extra
+        return item
+
+    def to_doc(self):
+        """The stored document (no _id, no type: the collection holds that)."""
+        doc = {"id": self.id, "text": self.text, "text_norm": self.text_norm, "status": self.status}
+        for key in ("source", "created_at", "reminder_time"):
+            value = getattr(self, key)
+            if value is not None:
+                doc[key] = value
+        if self.extra:
+            doc.update(self.extra)
+        return doc
+
+    def to_json(self):
+        """The API shape: the stored fields plus type, minus internal ones."""
+        doc = self.to_doc()
+        for key in INTERNAL_FIELDS:
+            doc.pop(key, None)
+        doc["type"] = self.type
+        return doc
+
+    # -------- value semantics --------
+    def replace(self, **changes):
+        """A copy with some fields changed (text/reminder_time keep text_norm/due in step)."""
+        item = Item.__new__(Item)
+        for slot in Item.__slots__:
+            setattr(item, slot, getattr(self, slot))
+        if "text" in changes:
+            item.text = changes.pop("text")
+            item.text_norm = normalize(item.text)
+        if "reminder_time" in changes:
+            item._set_reminder(changes.pop("reminder_time"))
+        for key, value in changes.items():
+            setattr(item, key, value)
+        return item
+
+    def __eq__(self, other):
+        if not isinstance(other, Item):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in _FIELDS + ("type", "extra"))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Item({self.type}, {self.id!r}, {self.text!r}, {self.status}, due={self.reminder_time})"
@@ -1,25 +1,34 @@
 import json
 import re
-from groq import Groq
-from textblob import TextBlob
-from agent.memory_manager import add_item, complete_item
+import difflib
+from agent.memory_manager import add_item, add_items, complete_item, find_items, refresh_text_index
+from agent.date_parser_helper import extract_time, format_time, upcoming
+from agent.intent import IntentClassifier
+from agent.intent_model import INTENT_MODEL_MAX_EXAMPLES, IntentModel, SEED_EXAMPLES
+from agent.llm_cache import chat_completion, stream_chat_completion
+from agent import metrics
 import os
-# ✅ Groq API Setup
+# ✅ Groq API Setup (one shared client + response cache in agent.llm_cache)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MODEL = "llama-3.1-8b-instant"
 
-client = Groq(api_key=GROQ_API_KEY)
-
 
 # ✅ Keyword Extraction — uses Regex + TextBlob + LLM fallback
 def extract_keywords(text):
+    start = metrics.clock()
+    phrase, source = _extract_keywords(text)
+    metrics.observe("extract_keywords", metrics.clock() - start, source)
+    return phrase
+
+
+def _extract_keywords(text):
+    """Returns (phrase, source) where source names the step that produced it."""
     import re
     from textblob import TextBlob
-    from groq import Groq
 
     text = text.strip()
     if not text:
-        return ""
+        return "", "empty"
 
     # --- 1️⃣ Regex-based smart keyword extraction ---
     regex_patterns = [
@@ -31,30 +40,30 @@ def extract_keywords(text):
         if match:
             phrase = match.group(1).strip()
             if len(phrase.split()) > 1:
-                return phrase
+                return phrase, "regex"
 
     # --- 2️⃣ TextBlob noun phrase extraction ---
-    blob = TextBlob(text)
-    noun_phrases = blob.noun_phrases
+    try:
+        noun_phrases = TextBlob(text).noun_phrases
+    except Exception as e:
+        # Missing local corpora (see agent.nlp_data) — fall through to the LLM
+        print(f"⚠ TextBlob unavailable: {e}")
+        noun_phrases = []
     if noun_phrases:
         phrase = " ".join(noun_phrases[:3])
         if phrase:
-            return phrase
+            return phrase, "textblob"
 
     # --- 3️⃣ LLM Fallback (Groq llama-3.1-8b-instant) ---
     try:
-        client = Groq(api_key=GROQ_API_KEY)
-        chat = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "Extract only the short actionable or event phrase (2–6 words) from this text."},
-                {"role": "user", "content": text}
-            ]
+        phrase = chat_completion(
+            "Extract only the short actionable or event phrase (2–6 words) from this text.",
+            text,
+            MODEL
         )
-        phrase = chat.choices[0].message.content.strip()
         phrase = re.sub(r"[^a-zA-Z0-9\s]", "", phrase)
         if phrase and len(phrase.split()) <= 6:
-            return phrase
+            return phrase, "llm"
     except Exception:
         pass
 
@@ -63,7 +72,7 @@ def extract_keywords(text):
         "the", "that", "this", "and", "with", "from", "have", "will",
         "need", "want", "make", "buy", "do", "to", "for", "a", "an", "it"
     ]]
-    return " ".join(words[:4])
+    return " ".join(words[:4]), "fallback"
 
 
 # ✅ Smart Matching Patterns
@@ -90,123 +99,259 @@ COMPLETE_PATTERNS = [
     r"\b(done|finished|completed|over|complete)\b"
 ]
 
+# One compiled pass over all three lists; completion wins over task over event.
+MESSAGE_CLASSIFIER = IntentClassifier([
+    ("complete", COMPLETE_PATTERNS),
+    ("task", TASK_PATTERNS),
+    ("event", EVENT_PATTERNS),
+])
+
+# Offline TF-IDF + naive Bayes model for the messages the patterns miss; it
+# keeps learning from regex hits and LLM verdicts (see agent.intent_model).
+INTENT_MODEL = IntentModel(SEED_EXAMPLES)
+
+
+def train_intent_model():
+    """Teach INTENT_MODEL every stored task and event, then refit it. Run once at startup."""
+    from agent.memory_manager import load_items
+    memory = load_items()
+    items = sorted(memory["tasks"] + memory["events"], key=lambda item: item.created_at or "")
+    # The model only keeps its newest examples; skip featurising the rest
+    INTENT_MODEL.learn_many((item.text, item.type) for item in items[-INTENT_MODEL_MAX_EXAMPLES:])
+    INTENT_MODEL.fit()
+    print(f"✅ Intent model trained on {len(INTENT_MODEL)} examples")
+
 
 
 # ✅ LLM Smart Classification — Used as fallback
-def ai_response(prompt: str):
-    """LLM call for fallback classification (task / event / chat)."""
+AI_SYSTEM_PROMPT = "You are a Smart Task Assistant. Identify if the message is a task, event, or chat."
+
+
+def ai_response(prompt: str, on_token=None):
+    """LLM call for fallback classification (task / event / chat); on_token streams it."""
     try:
-        chat = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a Smart Task Assistant. Identify if the message is a task, event, or chat."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return chat.choices[0].message.content.strip()
+        if on_token is not None:
+            return stream_chat_completion(AI_SYSTEM_PROMPT, prompt, MODEL, on_token)
+        return chat_completion(AI_SYSTEM_PROMPT, prompt, MODEL)
     except Exception as e:
         print(f"⚠ LLM Error: {e}")
         return ""
 
 
+# analyse_message asks INTENT_MODEL itself unless the caller already has
+# its decision (process_messages decides a whole batch at once).
+_ASK_MODEL = object()
+
+
 # ✅ Core Processing Function
-# ✅ Core Processing Function
-def process_message(message: str):
-    import difflib
-    import re
+def process_message(message: str, reminder_time=None, model_intent=_ASK_MODEL):
+    start = metrics.clock()
+    result = apply_analysis(analyse_message(message, model_intent=model_intent), reminder_time)
+    metrics.observe("process_message", metrics.clock() - start, result["result"]["source"])
+    return result
+
+
+def analyse_message(message: str, emit=None, model_intent=_ASK_MODEL):
+    """
+    The CPU / network half of process_message: regex classification, keyword
+    extraction and the Groq fallback. Reads and writes no storage, so it can
+    run in a worker process. Returns {"intent", "source", "key_text"}.
+
+    emit(event, data), if given, hears about progress as it happens:
+    "classification" once the intent is decided, and "token" for each chunk
+    of the Groq fallback reply (see /send/stream). model_intent, if given,
+    is INTENT_MODEL's decision already made for this message (None: unsure).
+    """
     msg_lower = message.lower().strip()
+    with metrics.timer("classify", "regex"):
+        classified = MESSAGE_CLASSIFIER.classify(msg_lower)
+    intent = classified.intent
+    if intent != "chat":
+        INTENT_MODEL.learn(msg_lower, intent)
+        if emit is not None:
+            emit("classification", {"type": intent, "source": "regex"})
 
-    # 🧠 Helper to find best fuzzy match among existing tasks/events
-    from agent.memory_manager import get_all_items
-    def find_best_match(text, tasks):
-        text = text.lower().strip()
-        best_match = None
-        highest_ratio = 0.0
-        for t in tasks:
-            ratio = difflib.SequenceMatcher(None, text, t["text"].lower()).ratio()
-            if ratio > highest_ratio:
-                highest_ratio = ratio
-                best_match = t
-        return best_match if highest_ratio > 0.7 else None
-
-    # 🟢 Completion Detection (Regex + Smart Match)
-    if any(re.search(p, msg_lower) for p in COMPLETE_PATTERNS):
-        # Extract main phrase before "done/completed"
-        parts = re.split(r"\b(done|finished|completed|over|complete)\b", msg_lower)
-        key_text = parts[0].strip() if parts else message.strip()
+    # 🟢 Completion: main phrase before "done/completed"
+    if intent == "complete":
+        key_text = msg_lower[:classified.span[0]].strip()
         if not key_text:
             key_text = extract_keywords(message)
-
-        # 🧩 Get all current tasks/events
-        try:
-            all_items = get_all_items()
-        except Exception:
-            all_items = []
-
-        # 🧠 Find best fuzzy match among all (task + event)
-        match_item = None
-        if all_items:
-            best_match = None
-            highest_ratio = 0.0
-            for t in all_items:
-                ratio = difflib.SequenceMatcher(None, key_text.lower(), t["text"].lower()).ratio()
-                if ratio > highest_ratio:
-                    highest_ratio = ratio
-                    best_match = t
-            if highest_ratio > 0.65:
-                match_item = best_match
-
-        # ✅ Use actual stored type instead of guessing
-        if match_item:
-            complete_item({"text": match_item["text"], "type": match_item["type"]})
-            return {
-                "result": {"type": "complete", "source": "regex"},
-                "reply": f"✅ {match_item['type'].capitalize()} '{match_item['text']}' completed and removed. ({match_item['source'].upper()})"
-            }
-        else:
-            return {
-                "result": {"type": "none", "source": "regex"},
-                "reply": "⚠️ No matching task or event found to complete."
-            }
+        return {"intent": "complete", "source": "regex", "key_text": key_text}
 
     # 🟡 Regex-based Smart Matching
-    if any(re.search(p, msg_lower) for p in TASK_PATTERNS):
-        key_text = extract_keywords(message)
-        add_item({"text": key_text, "type": "task", "source": "regex"})
-        return {"result": {"type": "task", "source": "regex"}, "reply": f"📝 Task added: {key_text}"}
+    if intent in ("task", "event"):
+        return {"intent": intent, "source": "regex", "key_text": extract_keywords(message)}
 
-    elif any(re.search(p, msg_lower) for p in EVENT_PATTERNS):
-        key_text = extract_keywords(message)
-        add_item({"text": key_text, "type": "event", "source": "regex"})
-        return {"result": {"type": "event", "source": "regex"}, "reply": f"📅 Event added: {key_text}"}
+    # 🟣 Local intent model: only messages it is unsure about reach the LLM
+    if model_intent is _ASK_MODEL:
+        with metrics.timer("classify", "model"):
+            model_intent = INTENT_MODEL.decide(msg_lower)
+    intent = model_intent
+    if intent is not None:
+        if emit is not None:
+            emit("classification", {"type": intent, "source": "model"})
+        key_text = extract_keywords(message) if intent != "chat" else ""
+        return {"intent": intent, "source": "model", "key_text": key_text}
 
     # 🔵 LLM Fallback Detection
-    raw = ai_response(message)
+    on_token = (lambda text: emit("token", {"text": text})) if emit is not None else None
+    raw = ai_response(message, on_token)
+    lower = raw.lower() if raw else ""
+    if any(word in lower for word in ["task", "todo", "reminder"]):
+        intent = "task"
+    elif any(word in lower for word in ["event", "meeting", "appointment"]):
+        intent = "event"
+    elif any(word in lower for word in ["done", "completed", "finished", "over"]):
+        intent = "complete"
+    else:
+        intent = "chat"
+    if raw:
+        INTENT_MODEL.learn(msg_lower, intent)
+    if emit is not None:
+        emit("classification", {"type": intent, "source": "llm"})
+    if intent == "chat":
+        return {"intent": "chat", "source": "llm", "key_text": ""}
+
     try:
-        if not raw:
-            raise ValueError("Empty LLM response")
+        key_text = extract_keywords(message)
+    except Exception as e:
+        print(f"⚠ Error in LLM handling: {e}")
+        return {"intent": "chat", "source": "llm", "key_text": ""}
+    return {"intent": intent, "source": "llm", "key_text": key_text}
 
-        lower = raw.lower()
-        if any(word in lower for word in ["task", "todo", "reminder"]):
-            key_text = extract_keywords(message)
-            add_item({"text": key_text, "type": "task", "source": "llm"})
-            return {"result": {"type": "task", "source": "llm"}, "reply": f"📝 Task added: {key_text}"}
 
-        elif any(word in lower for word in ["event", "meeting", "appointment"]):
-            key_text = extract_keywords(message)
-            add_item({"text": key_text, "type": "event", "source": "llm"})
-            return {"result": {"type": "event", "source": "llm"}, "reply": f"📅 Event added: {key_text}"}
+def apply_analysis(analysis, reminder_time=None):
+    """The storage half of process_message: add or complete the matched item."""
+    intent, source, key_text = analysis["intent"], analysis["source"], analysis["key_text"]
 
-        elif any(word in lower for word in ["done", "completed", "finished", "over"]):
-            key_text = extract_keywords(message)
-            all_items = get_all_items()
-            match_item = find_best_match(key_text, all_items)
+    if source == "regex":
+        if intent == "complete":
+            return _complete_regex(key_text)
+        return _add(intent, key_text, source, reminder_time)
+
+    try:
+        if intent in ("task", "event"):
+            return _add(intent, key_text, source, reminder_time)
+        if intent == "complete":
+            match_item = _find_stored_match(key_text, 0.7)
             if match_item:
-                complete_item({"text": match_item["text"], "type": match_item["type"]})
-                return {"result": {"type": "complete", "source": "llm"},
-                        "reply": f"✅ Marked completed: {match_item['text']}"}
+                complete_item({"id": match_item.id})
+                return {"result": {"type": "complete", "source": source},
+                        "reply": f"✅ Marked completed: {match_item.text}"}
     except Exception as e:
         print(f"⚠ Error in LLM handling: {e}")
 
     # ⚪ Default Fallback
-    return {"result": {"type": "chat", "source": "llm"}, "reply": "💬 Got it! No task or event detected."}
+    return {"result": {"type": "chat", "source": source}, "reply": "💬 Got it! No task or event detected."}
+
+
+def _add(intent, key_text, source, reminder_time):
+    add_item({"text": key_text, "type": intent, "source": source, "reminder_time": reminder_time})
+    if intent == "task":
+        return {"result": {"type": "task", "source": source}, "reply": f"📝 Task added: {key_text}"}
+    return {"result": {"type": "event", "source": source}, "reply": f"📅 Event added: {key_text}"}
+
+
+def _find_stored_match(text, threshold):
+    """Best match among the shortlisted items; on a miss, once more after catching up with the store."""
+    match_item = _find_best_match(text, find_items(text), threshold)
+    if match_item is None and refresh_text_index():
+        match_item = _find_best_match(text, find_items(text), threshold)
+    return match_item
+
+
+# 🧠 Helper to find best fuzzy match among existing tasks/events
+def _find_best_match(text, items, threshold):
+    text = text.lower().strip()
+    best_match = None
+    highest_ratio = 0.0
+    for t in items:
+        ratio = difflib.SequenceMatcher(None, text, t.text.lower()).ratio()
+        if ratio > highest_ratio:
+            highest_ratio = ratio
+            best_match = t
+    return best_match if highest_ratio > threshold else None
+
+
+def _complete_regex(key_text):
+    # 🧩 Best fuzzy match among tasks/events sharing words/trigrams with the phrase
+    try:
+        match_item = _find_stored_match(key_text, 0.65)
+    except Exception:
+        match_item = None
+
+    # ✅ Use actual stored type instead of guessing
+    if match_item:
+        complete_item({"id": match_item.id})
+        return {
+            "result": {"type": "complete", "source": "regex"},
+            "reply": f"✅ {match_item.type.capitalize()} '{match_item.text}' completed and removed. ({(match_item.source or 'regex').upper()})"
+        }
+    return {
+        "result": {"type": "none", "source": "regex"},
+        "reply": "⚠️ No matching task or event found to complete."
+    }
+
+
+# ✅ Batch Processing (bulk imports)
+def process_messages(messages):
+    """
+    Process many messages in one go. Messages are classified together (the
+    regex rules, then INTENT_MODEL in one batch for the ones they miss);
+    task/event messages have their dates extracted up front and are stored
+    with a single insert_many per collection (reminders included) for each
+    run of them. Anything else (completions, LLM fallback) goes through
+    process_message once the run before it is stored, so the results match
+    sending the messages one at a time.
+    Returns one {"reply", "type", "source"} dict per message, in order.
+    """
+    lowered = [m.lower().strip() for m in messages]
+    intents = MESSAGE_CLASSIFIER.classify_many(lowered)
+    detected = [upcoming(extract_time(m)) for m in messages]
+    # Regex completions go through process_message, which learns them
+    INTENT_MODEL.learn_many((text, c.intent) for text, c in zip(lowered, intents) if c.intent in ("task", "event"))
+    misses = [i for i, c in enumerate(intents) if c.intent == "chat" and lowered[i]]
+    with metrics.timer("classify", "model"):
+        local = dict(zip(misses, INTENT_MODEL.decide_many([lowered[i] for i in misses])))
+
+    results = [None] * len(messages)
+    pending = []
+
+    def flush():
+        created = add_items([data for _, data in pending])
+        for (i, data), item in zip(pending, created):
+            if item is None:
+                results[i] = ("chat", data["source"], "💬 Got it! No task or event detected.")
+            elif data["type"] == "task":
+                results[i] = ("task", data["source"], f"📝 Task added: {item.text}")
+            else:
+                results[i] = ("event", data["source"], f"📅 Event added: {item.text}")
+        pending.clear()
+
+    for i, (message, classified) in enumerate(zip(messages, intents)):
+        if not message.strip():
+            results[i] = ("chat", "regex", "💬 Got it! No task or event detected.")
+        elif classified.intent in ("task", "event") or local.get(i) in ("task", "event"):
+            pending.append((i, {
+                "text": extract_keywords(message),
+                "type": classified.intent if classified.intent != "chat" else local[i],
+                "source": "regex" if classified.intent != "chat" else "model",
+                "reminder_time": detected[i],
+            }))
+        elif local.get(i) == "chat":
+            results[i] = ("chat", "model", "💬 Got it! No task or event detected.")
+        else:
+            # Store what came before, so a completion sees the items added
+            # earlier in the batch, just as separate /send calls would
+            flush()
+            # Decided (or escalated) above: don't count it twice in INTENT_MODEL.stats()
+            result = process_message(message, reminder_time=detected[i], model_intent=local.get(i))
+            results[i] = (result["result"]["type"], result["result"]["source"], result["reply"])
+    flush()
+
+    replies = []
+    for (msg_type, source, reply), when in zip(results, detected):
+        if when and msg_type in ["task", "event"]:
+            reply += f"\n🕒 Reminder set for {format_time(when)}"
+        replies.append({"reply": reply, "type": msg_type, "source": source})
+    return replies
@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from agent import metrics
+
+# ✅ Cache sizing (tune with the hit/miss counters from stats())
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """One Groq client per process, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from groq import Groq
+                _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _client
+
+
+def set_client(client):
+    """Swap in another client (e.g. a local fake exposing chat.completions.create)."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def normalize_prompt(text):
+    """Lowercase, drop punctuation and collapse whitespace: 'Buy milk!' == 'buy  milk'."""
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
+
+
+class LLMCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL. Concurrent misses for the same
+    key are coalesced: the first caller computes, the others wait on its result.
+    """
+
+    def __init__(self, max_size=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}             # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if value:  # never cache empty answers
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+
+completion_cache = LLMCache()
+
+
+def chat_completion(system_prompt, user_prompt, model):
+    """Cached Groq chat completion; returns the stripped reply text."""
+    key = (model, system_prompt, normalize_prompt(user_prompt))
+
+    def call():
+        with metrics.timer("groq", model):
+            chat = get_client().chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ]
+            )
+        return chat.choices[0].message.content.strip()
+
+    return completion_cache.get_or_compute(key, call)
+
+
+def stream_chat_completion(system_prompt, user_prompt, model, on_token):
+    """
+    chat_completion, but on_token(text) is called with each chunk as Groq
+    streams it. Cache hits (and callers coalesced onto another request) get
+    the whole reply as a single chunk. Returns the stripped reply text.
+    """
+    key = (model, system_prompt, normalize_prompt(user_prompt))
+    streamed = False
+
+    def call():
+        nonlocal streamed
+        streamed = True
+        parts = []
+        start = metrics.clock()
+        with metrics.timer("groq", model):
+            chunks = get_client().chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                stream=True,
+            )
+            for chunk in chunks:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if not text:
+                    continue
+                if not parts:
+                    metrics.observe("groq_first_token", metrics.clock() - start, model)
+                parts.append(text)
+                on_token(text)
+        return "".join(parts).strip()
+
+    value = completion_cache.get_or_compute(key, call)
+    if not streamed and value:
+        on_token(value)
+    return value
@@ -0,0 +1,396 @@
+"""
+Embedded storage engine: the subset of the pymongo collection API that
+memory_manager uses, on top of SQLite.
+
+It is used when MongoDB is unreachable, or always with
+STORAGE_BACKEND=sqlite. Each collection is one table of JSON documents
+keyed by _id, and the whole table is mirrored in memory:
+
+- Reads match against the mirror (an id lookup is a dict hit) and never
+  touch disk.
+- Writes go to the mirror and to SQLite in one transaction, so they are
+  durable once they return. SQLite runs in WAL mode.
+
+Several processes can share one file. Every operation compares
+PRAGMA data_version with the last value it saw, and reloads the mirror
+when another process has committed since. Writes run under BEGIN
+IMMEDIATE, so a find_one_and_update is atomic across processes as well.
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from bson import ObjectId
+
+
+# ======================================================
+# 🔍 QUERY LANGUAGE SUBSET
+# ======================================================
+_MISSING = object()
+
+
+def _match_value(value, cond):
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op == "$exists":
+                if (value is not _MISSING) != bool(arg):
+                    return False
+            elif op == "$ne":
+                if value == arg:
+                    return False
+            elif op == "$in":
+                if value not in arg:
+                    return False
+            elif op == "$nin":
+                if value in arg:
+                    return False
+            elif value is _MISSING or value is None:
+                return False
+            elif op == "$lt" and not value < arg:
+                return False
+            elif op == "$lte" and not value <= arg:
+                return False
+            elif op == "$gt" and not value > arg:
+                return False
+            elif op == "$gte" and not value >= arg:
+                return False
+        return True
+    return value == cond
+
+
+def matches(doc, query):
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+        elif not _match_value(doc.get(key, _MISSING), cond):
+            return False
+    return True
+
+
+def project(doc, projection):
+    if not projection:
+        return dict(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+def apply_update(doc, update):
+    doc.update(update.get("$set", {}))
+    for key in update.get("$unset", {}):
+        doc.pop(key, None)
+    for key, step in update.get("$inc", {}).items():
+        doc[key] = doc.get(key, 0) + step
+
+
+def _seed_from_query(query):
+    """The document an upsert starts from: the query's plain equality fields."""
+    return {k: v for k, v in (query or {}).items() if not k.startswith("$") and not isinstance(v, dict)}
+
+
+class Cursor(list):
+    """List that also answers the pymongo cursor calls memory_manager chains."""
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction or 1)]
+        for key, order in reversed(keys):
+            super().sort(key=lambda d: (d.get(key) is not None, d.get(key) or ""), reverse=order < 0)
+        return self
+
+    def limit(self, n):
+        return Cursor(self[:n]) if n else self
+
+    def batch_size(self, n):
+        return self
+
+
+class Result:
+    def __init__(self, matched=0, modified=0, deleted=0, inserted_ids=None, upserted_id=None):
+        self.matched_count = matched
+        self.modified_count = modified
+        self.deleted_count = deleted
+        self.inserted_ids = inserted_ids or []
+        self.inserted_id = self.inserted_ids[0] if self.inserted_ids else None
+        self.upserted_id = upserted_id
+
+
+# ======================================================
+# 💾 SQLITE-BACKED COLLECTIONS
+# ======================================================
+_INDEXABLE = (str, int, float)
+
+
+def _key(_id):
+    return str(_id)
+
+
+def _restore_id(key):
+    return ObjectId(key) if ObjectId.is_valid(key) else key
+
+
+class LocalDatabase:
+    """One SQLite file; db["name"] returns a LocalCollection."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._collections = {}
+        self._data_version = None
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = LocalCollection(self, name)
+            return self._collections[name]
+
+    def list_collection_names(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'c_%'")
+            return [row[0][2:] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _sync(self):
+        # Another process committed since we last looked: drop every mirror.
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            if self._data_version is not None:
+                for collection in self._collections.values():
+                    collection._mirror = None
+            self._data_version = version
+
+    @contextmanager
+    def _read(self):
+        with self._lock:
+            self._sync()
+            yield
+
+    @contextmanager
+    def _write(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync()
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                for collection in self._collections.values():
+                    collection._mirror = None   # may hold the rolled-back change
+                raise
+            self._conn.execute("COMMIT")
+
+
+class LocalCollection:
+    """A pymongo-compatible collection backed by one SQLite table."""
+
+    def __init__(self, database, name):
+        self._db = database
+        self.name = name
+        self._table = f'"c_{name}"'
+        self._mirror = None     # key -> doc
+        self._fields = ["id"]   # fields with an equality index
+        self._index = None      # field -> value -> {key: None}
+        with database._lock:
+            database._conn.execute(f"CREATE TABLE IF NOT EXISTS {self._table} (key TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+
+    # -------- mirror --------
+    def _docs(self):
+        if self._mirror is None:
+            self._mirror, self._index = {}, {field: {} for field in self._fields}
+            for key, raw in self._db._conn.execute(f"SELECT key, doc FROM {self._table} ORDER BY rowid"):
+                doc = json.loads(raw)
+                doc["_id"] = _restore_id(key)
+                self._mirror[key] = doc
+                self._index_add(key, doc)
+        return self._mirror
+
+    def _index_add(self, key, doc):
+        for field, by_value in self._index.items():
+            value = doc.get(field)
+            if isinstance(value, _INDEXABLE):
+                by_value.setdefault(value, {})[key] = None
+
+    def _index_remove(self, key, doc):
+        for field, by_value in self._index.items():
+            value = doc.get(field)
+            if isinstance(value, _INDEXABLE) and value in by_value:
+                by_value[value].pop(key, None)
+                if not by_value[value]:
+                    del by_value[value]
+
+    def _candidates(self, query):
+        docs = self._docs()
+        for field in self._fields:
+            value = (query or {}).get(field)
+            if isinstance(value, _INDEXABLE):
+                return [docs[key] for key in self._index[field].get(value, ())]
+        return docs.values()
+
+    def create_index(self, keys, **kwargs):
+        """Equality index on the first key; range conditions still scan."""
+        field = keys if isinstance(keys, str) else keys[0][0]
+        with self._db._read():
+            if field not in self._fields:
+                self._fields.append(field)
+                if self._mirror is not None:
+                    self._index[field] = {}
+                    for key, doc in self._mirror.items():
+                        self._index_add(key, doc)
+        return f"{field}_1"
+
+    def drop_indexes(self):
+        with self._db._read():
+            self._fields = []
+            self._index = {} if self._mirror is not None else None
+
+    def _match(self, query):
+        return [doc for doc in self._candidates(query) if matches(doc, query)]
+
+    # -------- reads --------
+    def find(self, query=None, projection=None):
+        with self._db._read():
+            return Cursor(project(doc, projection) for doc in self._match(query))
+
+    def find_one(self, query=None, projection=None):
+        with self._db._read():
+            for doc in self._candidates(query):
+                if matches(doc, query):
+                    return project(doc, projection)
+        return None
+
+    def count_documents(self, query):
+        with self._db._read():
+            return len(self._match(query))
+
+    # -------- writes --------
+    def insert_one(self, doc):
+        with self._db._write() as conn:
+            return Result(inserted_ids=[self._insert(conn, doc)])
+
+    def insert_many(self, docs, ordered=True):
+        with self._db._write() as conn:
+            return Result(inserted_ids=[self._insert(conn, doc) for doc in docs])
+
+    def delete_one(self, query):
+        with self._db._write() as conn:
+            return Result(deleted=self._delete(conn, query, many=False))
+
+    def delete_many(self, query):
+        with self._db._write() as conn:
+            return Result(deleted=self._delete(conn, query, many=True))
+
+    def replace_one(self, query, doc, upsert=False):
+        with self._db._write() as conn:
+            return self._replace(conn, query, doc, upsert)
+
+    def update_one(self, query, update, upsert=False):
+        with self._db._write() as conn:
+            return self._update(conn, query, update, many=False, upsert=upsert)
+
+    def update_many(self, query, update, upsert=False):
+        with self._db._write() as conn:
+            return self._update(conn, query, update, many=True, upsert=upsert)
+
+    def find_one_and_update(self, query, update, projection=None, return_document=False, upsert=False, **kwargs):
+        # return_document: False/ReturnDocument.BEFORE or True/ReturnDocument.AFTER
+        with self._db._write() as conn:
+            found = self._match(query)
+            if not found:
+                if upsert:
+                    doc = _seed_from_query(query)
+                    apply_update(doc, update)
+                    self._insert(conn, doc)
+                    return project(doc, projection) if return_document else None
+                return None
+            before = project(found[0], projection)
+            doc = dict(found[0])   # _store un-indexes the mirrored original
+            apply_update(doc, update)
+            self._store(conn, doc)
+            return project(doc, projection) if return_document else before
+
+    def bulk_write(self, ops, ordered=True):
+        with self._db._write() as conn:
+            for op in ops:
+                kind = type(op).__name__
+                doc = getattr(op, "_doc", None)
+                if kind == "ReplaceOne":
+                    self._replace(conn, op._filter, doc, op._upsert)
+                elif kind == "DeleteOne":
+                    self._delete(conn, op._filter, many=False)
+                elif kind == "DeleteMany":
+                    self._delete(conn, op._filter, many=True)
+                elif kind == "UpdateOne":
+                    self._update(conn, op._filter, doc, many=False, upsert=op._upsert)
+                elif kind == "InsertOne":
+                    self._insert(conn, doc)
+        return Result()
+
+    # -------- internals (caller holds the write transaction) --------
+    def _store(self, conn, doc):
+        key = _key(doc["_id"])
+        body = {k: v for k, v in doc.items() if k != "_id"}
+        conn.execute(f"INSERT OR REPLACE INTO {self._table} (key, doc) VALUES (?, ?)",
+                     (key, json.dumps(body, default=str, ensure_ascii=False)))
+        docs = self._docs()
+        if key in docs:
+            self._index_remove(key, docs[key])
+        docs[key] = doc
+        self._index_add(key, doc)
+
+    def _insert(self, conn, doc):
+        doc.setdefault("_id", ObjectId())
+        self._store(conn, copy.copy(doc))
+        return doc["_id"]
+
+    def _delete(self, conn, query, many):
+        found = self._match(query)
+        if not many:
+            found = found[:1]
+        for doc in found:
+            key = _key(doc["_id"])
+            conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            self._index_remove(key, doc)
+            del self._mirror[key]
+        return len(found)
+
+    def _replace(self, conn, query, doc, upsert):
+        found = self._match(query)
+        if found:
+            self._store(conn, dict(doc, _id=found[0]["_id"]))
+            return Result(matched=1, modified=1)
+        if upsert:
+            return Result(upserted_id=self._insert(conn, dict(doc)))
+        return Result()
+
+    def _update(self, conn, query, update, many, upsert=False):
+        found = self._match(query)
+        if not many:
+            found = found[:1]
+        for doc in found:
+            # Update a copy: _store un-indexes by the mirrored doc's old values
+            doc = dict(doc)
+            apply_update(doc, update)
+            self._store(conn, doc)
+        if not found and upsert:
+            doc = _seed_from_query(query)
+            apply_update(doc, update)
+            return Result(upserted_id=self._insert(conn, doc))
+        return Result(matched=len(found), modified=len(found))
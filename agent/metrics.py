@@ -0,0 +1,172 @@
+"""
+In-process latency histograms and gauges, rendered in the Prometheus text
+exposition format by GET /metrics.
+
+    @metrics.timed("db.add_item")          # whole-function timing
+    with metrics.timer("classify", "regex"):  # a block inside a function
+        ...
+    metrics.observe("process_message", seconds, source="llm")
+
+Set METRICS_ENABLED=0 to turn instrumentation off: timed() then hands back
+the undecorated function, and timer() / observe() return immediately.
+"""
+import bisect
+import os
+import threading
+import time
+from functools import wraps
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+# Seconds; spans a cached regex hit (sub-ms) to a slow Groq round-trip.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+
+clock = time.perf_counter
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}      # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts)) for labels, counts in self._series.items())
+        for labels, counts in series:
+            base = list(zip(self.labelnames, labels))
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(base + [('le', le)])} {running}")
+            lines.append(f"{self.name}_sum{_labels(base)} {counts[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(base)} {running}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+# ======================================================
+# 📏 REGISTRY
+# ======================================================
+stage_seconds = Histogram(
+    "agent_stage_duration_seconds",
+    "Time spent per pipeline stage, labelled with the handler source.",
+    ("stage", "source"),
+)
+reminder_lag_seconds = Histogram(
+    "agent_reminder_lag_seconds",
+    "Delay between a reminder's due time and the moment it fired.",
+    buckets=LAG_BUCKETS,
+)
+_histograms = [stage_seconds, reminder_lag_seconds]
+_gauges = {}           # name -> (help, callable, "gauge" | "counter")
+
+
+def register_gauge(name, help_text, fn, kind="gauge"):
+    """Expose fn() (read at scrape time) as a gauge, or a counter if it only grows."""
+    _gauges[name] = (help_text, fn, kind)
+
+
+def observe(stage, seconds, source=""):
+    if ENABLED:
+        stage_seconds.observe(seconds, (stage, source))
+
+
+def observe_reminder_lag(seconds):
+    if ENABLED:
+        reminder_lag_seconds.observe(max(seconds, 0.0))
+
+
+class _Timer:
+    __slots__ = ("stage", "source", "_start")
+
+    def __init__(self, stage, source):
+        self.stage = stage
+        self.source = source
+
+    def __enter__(self):
+        self._start = clock()
+        return self
+
+    def __exit__(self, *exc):
+        stage_seconds.observe(clock() - self._start, (self.stage, self.source))
+        return False
+
+
+class _NullTimer:
+    __slots__ = ("source",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage, source=""):
+    """Context manager timing a block; set `.source` inside it to relabel."""
+    return _Timer(stage, source) if ENABLED else _NULL_TIMER
+
+
+def timed(stage, source=""):
+    """Decorator timing every call of the wrapped function."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stage_seconds.observe(clock() - start, (stage, source))
+        return wrapper
+    return decorate
+
+
+def render():
+    """Every histogram and gauge in Prometheus text format (version 0.0.4)."""
+    lines = []
+    for histogram in _histograms:
+        lines.extend(histogram.render())
+    for name, (help_text, fn, kind) in sorted(_gauges.items()):
+        try:
+            value = float(fn())
+        except Exception:
+            continue
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value:g}"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,65 @@
+"""
+Local TextBlob / NLTK corpora.
+
+Corpora are downloaded once, at build time, into NLP_DATA_DIR:
+
+    python -m agent.nlp_data
+
+which writes a marker file when every corpus is present. At boot the app
+only calls configure(): it checks the marker and points NLTK at the
+directory through NLTK_DATA. Nothing is downloaded while the process starts.
+"""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NLP_DATA_DIR = os.getenv("NLP_DATA_DIR", os.path.join(BASE_DIR, "nlp_data"))
+MARKER_FILE = os.path.join(NLP_DATA_DIR, ".corpora_ready")
+
+# What TextBlob needs (old and new NLTK resource names) plus the extras the
+# app used to fetch at import time.
+CORPORA = [
+    "brown", "punkt", "punkt_tab", "wordnet",
+    "averaged_perceptron_tagger", "averaged_perceptron_tagger_eng",
+    "conll2000", "movie_reviews", "treebank",
+]
+
+_configured = None
+
+
+def configure():
+    """Point NLTK at the local data directory. Returns True if the corpora are ready."""
+    global _configured
+    if _configured is not None:
+        return _configured
+
+    _configured = os.path.exists(MARKER_FILE)
+    if _configured:
+        # nltk reads NLTK_DATA when it is first imported, so this keeps the
+        # (slow) nltk import out of startup entirely.
+        paths = [NLP_DATA_DIR] + [p for p in os.getenv("NLTK_DATA", "").split(os.pathsep) if p]
+        os.environ["NLTK_DATA"] = os.pathsep.join(paths)
+        print(f"✅ NLP corpora ready in {NLP_DATA_DIR}")
+    else:
+        print(f"⚠ NLP corpora not found in {NLP_DATA_DIR}; run `python -m agent.nlp_data` at build time")
+    return _configured
+
+
+def download():
+    """Fetch every corpus into NLP_DATA_DIR and write the marker file."""
+    import nltk
+
+    os.makedirs(NLP_DATA_DIR, exist_ok=True)
+    failed = [name for name in CORPORA if not nltk.download(name, download_dir=NLP_DATA_DIR, quiet=True)]
+    if failed:
+        print("⚠ Could not download corpora:", ", ".join(failed))
+        return False
+
+    with open(MARKER_FILE, "w") as f:
+        f.write("\n".join(CORPORA) + "\n")
+    print(f"✅ All TextBlob and NLTK corpora downloaded to {NLP_DATA_DIR}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if download() else 1)
@@ -1,102 +1,76 @@
 import asyncio
-from datetime import datetime
-from zoneinfo import ZoneInfo
+import os
 from agent import memory_manager
-from agent.date_parser_helper import format_time  # if used elsewhere
+from agent.scheduler import reminder_scheduler
 
 # ✅ Import broadcast helper from main
 from agent.broadcasting import broadcast_notification  
 
-KOLKATA = ZoneInfo("Asia/Kolkata")
-reminder_tasks = {}
+# How often each worker looks for due reminders it does not hold: ones added
+# on another worker, or claims whose lease expired with their owner.
+REMINDER_SWEEP_SECONDS = float(os.getenv("REMINDER_SWEEP_SECONDS", "30"))
 
 async def send_reminders(app):
-    """Background task: checks reminders every minute (uses aware datetimes)."""
-    while True:
-        try:
-            memory = memory_manager.load_memory()
-            now = datetime.now(KOLKATA)
-
-            for section in ["tasks", "events"]:
-                for item in memory.get(section, []):
-                    if "reminder_time" in item and item.get("status") != "completed":
-                        # reminder_time is stored as "YYYY-MM-DD HH:MM" (string)
-                        try:
-                            target = datetime.strptime(item["reminder_time"], "%Y-%m-%d %H:%M")
-                            target = target.replace(tzinfo=KOLKATA)
-                        except Exception:
-                            # If stored value was ISO or different, try fromisoformat
-                            try:
-                                target = datetime.fromisoformat(item["reminder_time"])
-                                if target.tzinfo is None:
-                                    target = target.replace(tzinfo=KOLKATA)
-                                else:
-                                    target = target.astimezone(KOLKATA)
-                            except Exception:
-                                # skip invalid format
-                                continue
+    """
+    Background task: fires reminders from the in-memory heap scheduler.
+    The heap is seeded once from the store and then kept current by
+    add_item / complete_item, so the loop sleeps exactly until the next
+    deadline instead of rescanning every minute.
+    """
+    try:
+        pending = await memory_manager.get_pending_reminders_async()
+    except Exception as e:
+        print("⚠ Could not load pending reminders:", e)
+        pending = []
 
-                        # 🔔 Trigger notification when due
-                        if now >= target and item.get("status") != "notified":
-                            text = item.get("text", "No description")
-                            print(f"🔔 Reminder: {text}")
-                            item["status"] = "notified"
-                            memory_manager.save_memory(memory)
+    for item in pending:
+        memory_manager.schedule_item_reminder(item)
+    print(f"⏳ Reminder scheduler loaded {len(reminder_scheduler)} pending reminder(s)")
 
-                            # ✅ Broadcast instant notification to all connected clients
-                            try:
-                                await broadcast_notification(
-                                    f"Reminder: {section[:-1].capitalize()}",
-                                    text
-                                )
-                            except Exception as e:
-                                print(f"⚠ WebSocket broadcast error: {e}")
+    sweeper = asyncio.create_task(_sweep_due_reminders())
+    try:
+        await reminder_scheduler.run(_fire_reminder)
+    finally:
+        sweeper.cancel()
 
-            await asyncio.sleep(60)
 
+async def _sweep_due_reminders():
+    """Re-queue due reminders nobody holds; claiming decides who fires them."""
+    while True:
+        await asyncio.sleep(REMINDER_SWEEP_SECONDS)
+        try:
+            due = await memory_manager.get_due_reminders_async()
         except Exception as e:
-            print("⚠ Reminder loop error:", e)
-            await asyncio.sleep(60)
+            print("⚠ Reminder sweep failed:", e)
+            continue
+        for item in due:
+            memory_manager.schedule_item_reminder(item)
+        if due:
+            print(f"🧹 Reminder sweep re-queued {len(due)} unclaimed reminder(s)")
 
 
-async def schedule_reminder(message, reminder_time_str):
-    """
-    reminder_time_str expected in 'YYYY-MM-DD HH:MM' (Asia/Kolkata) or ISO.
-    Schedules an asyncio task with correct delay using Asia/Kolkata as reference.
-    """
-    now = datetime.now(KOLKATA)
+async def _fire_reminder(item_id, item):
+    section = item.section
+    text = item.text
 
-    # Parse incoming string robustly
+    # 🔒 Only the worker that wins the claim fires the reminder
     try:
-        target = datetime.strptime(reminder_time_str, "%Y-%m-%d %H:%M")
-        target = target.replace(tzinfo=KOLKATA)
-    except Exception:
-        try:
-            target = datetime.fromisoformat(reminder_time_str)
-            if target.tzinfo is None:
-                target = target.replace(tzinfo=KOLKATA)
-            else:
-                target = target.astimezone(KOLKATA)
-        except Exception:
-            print(f"⚠ Invalid reminder_time format: {reminder_time_str}")
-            return
-
-    delay = (target - now).total_seconds()
-
-    if delay <= 0:
-        print(f"⏰ Skipping past reminder: {message} (target {target.isoformat()})")
+        claimed = await memory_manager.claim_reminder_async(item_id, section)
+    except Exception as e:
+        print(f"⚠ Could not claim reminder, firing locally: {e}")
+        claimed = item
+    if claimed is None:
         return
 
-    async def reminder_task():
-        await asyncio.sleep(delay)
-        print(f"🔔 Reminder: {message}")
+    print(f"🔔 Reminder: {text}")
 
-        # ✅ Broadcast real-time reminder notification
-        try:
-            await broadcast_notification("Reminder", message)
-        except Exception as e:
-            print(f"⚠ WebSocket broadcast error (schedule): {e}")
+    # ✅ Broadcast instant notification to all connected clients
+    try:
+        await broadcast_notification(f"Reminder: {section[:-1].capitalize()}", text)
+    except Exception as e:
+        print(f"⚠ WebSocket broadcast error: {e}")
 
-    task = asyncio.create_task(reminder_task())
-    reminder_tasks[message] = task
-    print(f"⏳ Reminder scheduled for: {target.isoformat()} → {message}")
\ No newline at end of file
+    try:
+        await memory_manager.finish_reminder_async(item_id, section)
+    except Exception as e:
+        print(f"⚠ Could not mark reminder as notified: {e}")
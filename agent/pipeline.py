@@ -0,0 +1,271 @@
+"""
+Where the /send pipeline runs.
+
+PIPELINE_MODE selects the executor for process_message + extract_time:
+
+    inline   on the event loop (debugging; blocks every other request)
+    thread   a dedicated thread pool for the CPU / network half
+             (classification, TextBlob, Groq, dateparser) (default)
+    process  a process pool for that half
+
+In both pooled modes storage happens in this process on the DB executor
+(memory_manager.run_in_db_executor), so its pool alone bounds the Mongo
+round-trips in flight, and the text index and reminder heap stay in one
+place.
+
+PIPELINE_WORKERS sizes the pool (default: one process per core, or the
+ThreadPoolExecutor default for threads) and PIPELINE_MAX_INFLIGHT caps how
+many messages may be queued or running at once (default 4 x workers); callers beyond that wait on a
+semaphore instead of piling work onto the executor. Process workers load
+the NLP libraries when they start (see _warm_worker).
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "thread").lower()
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "0"))       # 0 = size for the mode
+PIPELINE_MAX_INFLIGHT = int(os.getenv("PIPELINE_MAX_INFLIGHT", "0"))  # 0 = 4 x workers
+MODES = ("inline", "thread", "process")
+
+_executor = None
+_worker_init = None
+_semaphore = None
+_semaphore_loop = None
+_inflight = 0
+_waiting = 0
+
+
+def configure(mode=None, workers=None, max_inflight=None, worker_init=None):
+    """
+    Change the execution mode (shuts the current pool down). `worker_init`
+    is an importable callable run in every process worker after warm-up.
+    """
+    global PIPELINE_MODE, PIPELINE_WORKERS, PIPELINE_MAX_INFLIGHT, _worker_init, _semaphore
+    shutdown()
+    if mode is not None:
+        PIPELINE_MODE = mode.lower()
+    if workers is not None:
+        PIPELINE_WORKERS = workers
+    if max_inflight is not None:
+        PIPELINE_MAX_INFLIGHT = max_inflight
+    if worker_init is not None:
+        _worker_init = worker_init
+    _semaphore = None
+    if PIPELINE_MODE not in MODES:
+        raise ValueError(f"PIPELINE_MODE must be one of {', '.join(MODES)}, not {PIPELINE_MODE!r}")
+
+
+def _workers():
+    if PIPELINE_WORKERS > 0:
+        return PIPELINE_WORKERS
+    cpus = os.cpu_count() or 1
+    # Threads mostly wait on Groq / Mongo (ThreadPoolExecutor's own default);
+    # processes are for CPU work, one per core.
+    return cpus if PIPELINE_MODE == "process" else min(32, cpus + 4)
+
+
+def _max_inflight():
+    return PIPELINE_MAX_INFLIGHT if PIPELINE_MAX_INFLIGHT > 0 else 4 * _workers()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None and PIPELINE_MODE != "inline":
+        if PIPELINE_MODE == "process":
+            # spawn: the parent already runs Mongo and executor threads
+            from agent.llm_agent import INTENT_MODEL
+            _executor = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+                initargs=(_worker_init, INTENT_MODEL),
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="pipeline")
+    return _executor
+
+
+async def start():
+    """Train the intent model, create the pool and, for processes, start and warm every worker now."""
+    if PIPELINE_MODE not in MODES:
+        raise ValueError(f"PIPELINE_MODE must be one of {', '.join(MODES)}, not {PIPELINE_MODE!r}")
+    from agent.llm_agent import train_intent_model
+    from agent.memory_manager import run_in_db_executor
+    # Before the pool exists: process workers start with a copy of the trained model
+    await run_in_db_executor(train_intent_model)
+    executor = _get_executor()
+    if PIPELINE_MODE == "process":
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(_workers())))
+    print(f"✅ Pipeline running in {PIPELINE_MODE} mode ({_workers()} workers, {_max_inflight()} in flight)")
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def stats():
+    return {
+        "mode": PIPELINE_MODE,
+        "workers": _workers(),
+        "max_inflight": _max_inflight(),
+        "inflight": _inflight,
+        "waiting": _waiting,
+    }
+
+
+# ======================================================
+# 🏭 WORKER PROCESS SIDE
+# ======================================================
+def _warm_worker(worker_init=None, intent_model=None):
+    """Process-pool initializer: import and exercise the NLP stack once."""
+    from agent import nlp_data
+    nlp_data.configure()
+    from agent import llm_agent
+    from agent.date_parser_helper import extract_time
+
+    if intent_model is not None:
+        # Trained in the parent; from here on each worker keeps learning on its own
+        llm_agent.INTENT_MODEL = intent_model
+    llm_agent.MESSAGE_CLASSIFIER.classify("warm up")
+    llm_agent.INTENT_MODEL.predict("warm up")
+    extract_time("meeting on 5th November 3:30pm")   # dateparser language data
+    try:
+        from textblob import TextBlob
+        TextBlob("warm up the tagger").noun_phrases
+    except Exception:
+        pass   # corpora missing: extract_keywords falls back on its own
+    if worker_init is not None:
+        worker_init()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _analyse(message, emit=None):
+    from agent.date_parser_helper import extract_time, upcoming
+    from agent.llm_agent import analyse_message
+    return analyse_message(message, emit), upcoming(extract_time(message))
+
+
+def _process(message):
+    from agent.date_parser_helper import extract_time, upcoming
+    from agent.llm_agent import process_message
+    detected_time = upcoming(extract_time(message))
+    # The item carries its reminder_time, so the reminder is stored with it.
+    return process_message(message, detected_time), detected_time
+
+
+def _process_stream(message, emit):
+    """_process for /send/stream: classify first (streaming any Groq reply), then date and store."""
+    from agent import metrics
+    from agent.date_parser_helper import extract_time, format_time, upcoming
+    from agent.llm_agent import analyse_message, apply_analysis
+    start = metrics.clock()
+    analysis = analyse_message(message, emit)
+    detected_time = upcoming(extract_time(message))
+    if detected_time and analysis["intent"] in ("task", "event"):
+        emit("reminder", {"reminder_time": format_time(detected_time)})
+    result = apply_analysis(analysis, detected_time)
+    metrics.observe("process_message", metrics.clock() - start, result["result"]["source"])
+    return result, detected_time
+
+
+# ======================================================
+# 🚦 EVENT-LOOP SIDE
+# ======================================================
+def _get_semaphore():
+    # One semaphore per running loop (tests and benchmarks start several).
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore_loop is not loop:
+        _semaphore, _semaphore_loop = asyncio.Semaphore(_max_inflight()), loop
+    return _semaphore
+
+
+async def _bounded(func, *args):
+    global _inflight, _waiting
+    semaphore = _get_semaphore()
+    _waiting += 1
+    try:
+        await semaphore.acquire()
+    finally:
+        _waiting -= 1
+    _inflight += 1
+    try:
+        return await func(*args)
+    finally:
+        _inflight -= 1
+        semaphore.release()
+
+
+async def run_message(message):
+    """process_message + extract_time for one /send message -> (result, detected_time)."""
+    return await _bounded(_run_message, message)
+
+
+async def _run_message(message):
+    if PIPELINE_MODE == "inline":
+        return _process(message)
+
+    from agent import metrics
+    from agent.llm_agent import apply_analysis
+    from agent.memory_manager import run_in_db_executor
+
+    loop = asyncio.get_running_loop()
+    start = metrics.clock()
+    analysis, detected_time = await loop.run_in_executor(_get_executor(), _analyse, message)
+    result = await run_in_db_executor(apply_analysis, analysis, detected_time)
+    metrics.observe("process_message", metrics.clock() - start, result["result"]["source"])
+    return result, detected_time
+
+
+async def run_message_stream(message, emit):
+    """
+    run_message, reporting progress through emit(event, data) as it goes
+    (see llm_agent.analyse_message). emit is called from the executor
+    thread, so it must be thread-safe. Process workers cannot call back, so
+    in process mode the classification is reported once analysis returns
+    and the Groq reply is not streamed token by token.
+    """
+    return await _bounded(_run_message_stream, message, emit)
+
+
+async def _run_message_stream(message, emit):
+    if PIPELINE_MODE == "inline":
+        return _process_stream(message, emit)
+
+    from agent import metrics
+    from agent.date_parser_helper import format_time
+    from agent.llm_agent import apply_analysis
+    from agent.memory_manager import run_in_db_executor
+
+    loop = asyncio.get_running_loop()
+    start = metrics.clock()
+    if PIPELINE_MODE == "thread":
+        analysis, detected_time = await loop.run_in_executor(_get_executor(), _analyse, message, emit)
+    else:
+        analysis, detected_time = await loop.run_in_executor(_get_executor(), _analyse, message)
+        emit("classification", {"type": analysis["intent"], "source": analysis["source"]})
+    if detected_time and analysis["intent"] in ("task", "event"):
+        emit("reminder", {"reminder_time": format_time(detected_time)})
+    result = await run_in_db_executor(apply_analysis, analysis, detected_time)
+    metrics.observe("process_message", metrics.clock() - start, result["result"]["source"])
+    return result, detected_time
+
+
+async def run_batch(messages):
+    """process_messages for /send/batch. Storage-bound, so it stays on threads."""
+    from agent.llm_agent import process_messages
+    if PIPELINE_MODE == "inline":
+        return process_messages(messages)
+    loop = asyncio.get_running_loop()
+    executor = _get_executor() if PIPELINE_MODE == "thread" else None
+    return await _bounded(partial(loop.run_in_executor, executor, process_messages), messages)
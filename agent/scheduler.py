@@ -0,0 +1,128 @@
+import asyncio
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from agent import metrics
+from agent.date_parser_helper import KOLKATA, parse_reminder_time
+
+
+class ReminderScheduler:
+    """
+    Min-heap of pending reminders keyed on their timezone-aware due time.
+
+    schedule() / cancel() are thread-safe so memory_manager can call them from
+    the DB executor. Cancelled entries stay in the heap until they reach the
+    top (lazy deletion); the heap is compacted when stale entries pile up.
+    """
+
+    def __init__(self):
+        self._heap = []        # (due, seq, key)
+        self._entries = {}     # key -> (heap entry, payload)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, key, due, payload=None):
+        """Add or move a reminder. Returns False if `due` cannot be parsed."""
+        if not (isinstance(due, datetime) and due.tzinfo is not None):
+            due = parse_reminder_time(due)
+            if due is None:
+                return False
+
+        entry = (due, next(self._seq), key)
+        with self._lock:
+            self._entries[key] = (entry, payload)
+            heapq.heappush(self._heap, entry)
+            self._compact()
+            is_head = self._heap[0] is entry
+        if is_head:
+            self._wake()
+        return True
+
+    def cancel(self, key):
+        """Drop a pending reminder. Returns True if it was scheduled."""
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+            self._compact()
+        return removed
+
+    def _compact(self):
+        # Rescheduled and cancelled entries are stale; keep the heap within
+        # a constant factor of the live reminders (caller holds the lock).
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if self._is_live(e)]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now=None):
+        """Remove and return [(key, payload)] for every reminder due at `now`."""
+        return [(key, payload) for key, payload, _ in self._pop_due(now or datetime.now(KOLKATA))]
+
+    def _pop_due(self, now):
+        due = []
+        with self._lock:
+            while self._heap:
+                entry = self._heap[0]
+                if not self._is_live(entry):
+                    heapq.heappop(self._heap)
+                    continue
+                if entry[0] > now:
+                    break
+                heapq.heappop(self._heap)
+                _, payload = self._entries.pop(entry[2])
+                due.append((entry[2], payload, entry[0]))
+        return due
+
+    def next_deadline(self):
+        """Due time of the earliest live reminder, or None when idle."""
+        with self._lock:
+            while self._heap:
+                entry = self._heap[0]
+                if self._is_live(entry):
+                    return entry[0]
+                heapq.heappop(self._heap)
+        return None
+
+    async def run(self, on_due):
+        """Sleep until the next deadline, then await on_due(key, payload)."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            now = datetime.now(KOLKATA)
+            for key, payload, due in self._pop_due(now):
+                metrics.observe_reminder_lag((now - due).total_seconds())
+                try:
+                    await on_due(key, payload)
+                except Exception as e:
+                    print(f"⚠ Reminder handler error ({key}): {e}")
+
+            deadline = self.next_deadline()
+            timeout = None
+            if deadline is not None:
+                timeout = max((deadline - datetime.now(KOLKATA)).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _is_live(self, entry):
+        live = self._entries.get(entry[2])
+        return live is not None and live[0] is entry
+
+    def _wake(self):
+        # Called from any thread: a new earliest deadline must cut the sleep short.
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+
+reminder_scheduler = ReminderScheduler()
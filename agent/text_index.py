@@ -0,0 +1,105 @@
+import heapq
+import re
+import threading
+from collections import defaultdict
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Upper bound on posting entries scored per lookup. Rare terms are scored
+# first, so common ones ("the", "#bu") are what gets cut once it is spent,
+# which keeps a lookup flat no matter how many items are indexed.
+SHORTLIST_BUDGET = 2000
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def normalize(text):
+    """Canonical form stored as text_norm: 'Buy  Milk!' -> 'buy milk'."""
+    return " ".join(tokenize(text))
+
+
+def _terms(text):
+    """Word tokens plus padded character trigrams, so typos still overlap."""
+    terms = set()
+    for token in tokenize(text):
+        terms.add("w:" + token)
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            terms.add("g:" + padded[i:i + 3])
+    return terms
+
+
+class TextIndex:
+    """
+    In-process inverted index from word tokens and trigrams to item ids.
+    Used to shortlist completion candidates instead of scanning every item.
+    Holds and returns the (read-only) Items themselves, not copies.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(set)   # term -> {item id}
+        self._items = {}                    # item id -> (item, terms)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        item_id = item.id
+        if not item_id:
+            return
+        terms = _terms(item.text)
+        with self._lock:
+            self._discard(item_id)
+            self._items[item_id] = (item, terms)
+            for term in terms:
+                self._postings[term].add(item_id)
+
+    def remove(self, item_id):
+        with self._lock:
+            self._discard(item_id)
+
+    def rebuild(self, items):
+        with self._lock:
+            self._postings.clear()
+            self._items.clear()
+            for item in items:
+                self.add(item)
+
+    def get(self, item_id):
+        with self._lock:
+            entry = self._items.get(item_id)
+            return entry[0] if entry else None
+
+    def candidates(self, text, limit=20):
+        """Return up to `limit` indexed items ranked by weighted term overlap."""
+        terms = _terms(text)
+        with self._lock:
+            postings = sorted(
+                ((term, self._postings[term]) for term in terms if term in self._postings),
+                key=lambda pair: len(pair[1])
+            )
+            scores = defaultdict(float)
+            budget = SHORTLIST_BUDGET
+            for term, posting in postings:
+                if budget <= 0:
+                    break
+                budget -= len(posting)
+                weight = (4.0 if term.startswith("w:") else 1.0) / len(posting)
+                for item_id in posting:
+                    scores[item_id] += weight
+            ranked = heapq.nlargest(limit, scores, key=scores.get)
+            return [self._items[item_id][0] for item_id in ranked]
+
+    def _discard(self, item_id):
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(item_id)
+                if not posting:
+                    del self._postings[term]
@@ -0,0 +1,64 @@
+"""
+Bulk ingestion: process_messages (what /send/batch runs) versus calling the
+/send pipeline once per message, against an in-memory collection with a
+simulated round-trip latency.
+
+    python -m benchmarks.bench_batch [messages] [latency_ms]
+"""
+import sys
+import time
+from agent import date_parser_helper, llm_cache, memory_manager
+from agent.date_parser_helper import extract_time
+from agent.llm_agent import process_message, process_messages
+from benchmarks.fakes import FakeCollection, FakeGroq
+
+
+def _messages(n):
+    forms = [
+        "buy groceries for week {i} tomorrow at 5pm",
+        "submit report number {i}",
+        "team meeting about sprint {i} on friday at 3pm",
+        "clean the garage shelf {i}",
+    ]
+    return [forms[i % len(forms)].format(i=i) for i in range(n)]
+
+
+def _reset(latency):
+    memory_manager.tasks_collection = FakeCollection(latency)
+    memory_manager.events_collection = FakeCollection(latency)
+    memory_manager._text_index_ready = False
+    date_parser_helper._date_cache.clear()
+
+
+def _calls():
+    return memory_manager.tasks_collection.calls + memory_manager.events_collection.calls
+
+
+def _loop(messages):
+    for message in messages:
+        process_message(message, reminder_time=extract_time(message))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002
+    llm_cache.set_client(FakeGroq())
+    messages = _messages(n)
+    extract_time(messages[0])  # warm caches shared by both paths
+
+    rows = []
+    for label, run in [("loop over /send pipeline", _loop), ("process_messages (batch)", process_messages)]:
+        _reset(latency)
+        start = time.perf_counter()
+        run(messages)
+        elapsed = time.perf_counter() - start
+        rows.append((label, elapsed, _calls()))
+
+    print(f"{n} messages, {latency * 1000:.1f} ms per DB round-trip")
+    for label, elapsed, calls in rows:
+        print(f"{label:<26} {n / elapsed:10.0f} msg/s  {calls:6d} DB calls")
+    print(f"speed-up: {rows[0][1] / rows[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
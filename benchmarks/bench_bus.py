@@ -0,0 +1,145 @@
+"""
+Multi-process check of the Unix-socket notification bus. Starts several
+worker processes on one socket, has every worker publish, and verifies that
+each worker received every notification exactly once. Then kills the
+broker and checks the survivors elect a new one and keep delivering.
+Exits with 1 if any delivery is lost or duplicated.
+
+    python -m benchmarks.bench_bus [workers] [messages_per_worker]
+"""
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+from agent.bus import UnixSocketBus
+
+TIMEOUT = 15
+
+
+# ======================================================
+# 👷 WORKER PROCESS
+# ======================================================
+async def _worker(path):
+    latencies = []
+
+    def deliver(text):
+        latencies.append(time.time() - json.loads(text)["sent"])
+        return 1
+
+    bus = UnixSocketBus(deliver, path)
+    await bus.start()
+    loop = asyncio.get_running_loop()
+
+    def reply(**fields):
+        print(json.dumps(dict(fields, pid=os.getpid())), flush=True)
+
+    reply(ready=True)
+    while True:
+        line = (await loop.run_in_executor(None, sys.stdin.readline)).split()
+        if not line or line[0] == "exit":
+            break
+        if line[0] == "publish":
+            for i in range(int(line[1])):
+                await bus.publish(json.dumps({"title": "bench", "message": i, "sent": time.time()}))
+            reply(published=int(line[1]))
+        elif line[0] == "stats":
+            ordered = sorted(latencies) or [0.0]
+            reply(got=len(latencies), p50=ordered[len(ordered) // 2],
+                  p99=ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))], **bus.stats())
+    await bus.stop()
+
+
+# ======================================================
+# 🎛️ DRIVER
+# ======================================================
+class _Proc:
+    def __init__(self, proc):
+        self.proc = proc
+
+    async def ask(self, command):
+        self.proc.stdin.write(command.encode() + b"\n")
+        await self.proc.stdin.drain()
+        return await self.read()
+
+    async def read(self):
+        while True:
+            line = await asyncio.wait_for(self.proc.stdout.readline(), TIMEOUT)
+            if not line:
+                raise RuntimeError("worker exited")
+            if line.startswith(b"{"):
+                return json.loads(line)
+
+
+async def _spawn(path):
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.bench_bus", "--worker", path,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+    )
+    worker = _Proc(proc)
+    await worker.read()
+    return worker
+
+
+async def _wait_for(workers, expected):
+    deadline = time.monotonic() + TIMEOUT
+    while True:
+        stats = [await w.ask("stats") for w in workers]
+        if all(s["got"] >= expected and s["connected"] for s in stats) or time.monotonic() > deadline:
+            return stats
+        await asyncio.sleep(0.05)
+
+
+async def _round(label, workers, per_worker, already):
+    start = time.perf_counter()
+    await asyncio.gather(*(w.ask(f"publish {per_worker}") for w in workers))
+    expected = already + per_worker * len(workers)
+    stats = await _wait_for(workers, expected)
+    elapsed = time.perf_counter() - start
+    ok = all(s["got"] == expected for s in stats)
+    total = per_worker * len(workers) * len(workers)
+    status = "ok" if ok else f"FAILED: got {[s['got'] for s in stats]}, expected {expected} each"
+    print(f"{label:<22} {len(workers):>7} {total:>10} {total / elapsed:>10.0f}/s "
+          f"{max(s['p50'] for s in stats) * 1000:>8.2f}ms {max(s['p99'] for s in stats) * 1000:>8.2f}ms  {status}")
+    return ok, expected
+
+
+async def _main(count, per_worker):
+    path = os.path.join(tempfile.mkdtemp(prefix="bus-bench-"), "bus.sock")
+    workers = []
+    for _ in range(count):
+        workers.append(await _spawn(path))
+    await _wait_for(workers, 0)
+
+    print(f"{'round':<22} {'workers':>7} {'deliveries':>10} {'rate':>12} {'p50':>10} {'p99':>10}")
+    ok, received = await _round("all workers up", workers, per_worker, 0)
+
+    # Failover: kill the broker, let the survivors re-elect and reconnect.
+    stats = [await w.ask("stats") for w in workers]
+    broker = next(w for w, s in zip(workers, stats) if s["role"] == "broker")
+    broker.proc.send_signal(signal.SIGKILL)
+    await broker.proc.wait()
+    survivors = [w for w in workers if w is not broker]
+    await _wait_for(survivors, received)
+    ok2, _ = await _round("after broker killed", survivors, per_worker, received)
+
+    for w in survivors:
+        w.proc.stdin.write(b"exit\n")
+        await w.proc.stdin.drain()
+        await w.proc.wait()
+    return ok and ok2
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--worker":
+        asyncio.run(_worker(sys.argv[2]))
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    sys.exit(0 if asyncio.run(_main(count, per_worker)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+/check_reminders with K due reminders among N stored items, comparing two
+approaches:
+- per-item: load every item, test each one's reminder_time in Python, and
+  send one benchmarks.fakes.mark_notified update per due item (the previous
+  endpoint);
+- set-based: memory_manager.claim_due_reminders, which uses one
+  update_many plus one find per section.
+Also has several pollers hit the same due set at once and checks that
+every reminder is reported exactly once.
+
+Runs against the embedded SQLite store by default, or against a scratch
+database on a MongoDB server with --mongo (dropped afterwards).
+
+    python -m benchmarks.bench_check_reminders [--items 20000] [--pollers 8] [--mongo URL]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from agent import memory_manager
+from agent.date_parser_helper import KOLKATA, format_time
+from agent.db import INDEXES
+from agent.local_store import LocalDatabase
+from benchmarks.fakes import mark_notified
+
+DUE_COUNTS = [1, 10, 100, 1000]
+
+
+def _seed(database, n):
+    now = datetime.now(KOLKATA).replace(tzinfo=None)
+    for section in ("tasks", "events"):
+        collection = database[section]
+        for _, keys in (entry for entry in INDEXES if entry[0] == section):
+            collection.create_index(keys)
+        docs = [{
+            "id": f"{section}-{i}",
+            "text": f"{section[:-1]} number {i}",
+            "status": "pending",
+            "created_at": (now - timedelta(days=1)).isoformat(),
+            # Reminders spread over the next days: none due until a round makes some due
+            "reminder_time": format_time(now + timedelta(minutes=10 + i)),
+        } for i in range(n // 2)]
+        for i in range(0, len(docs), 10000):
+            collection.insert_many(docs[i:i + 10000])
+
+
+def _make_due(database, k):
+    """Move k reminders (split across both sections) into the past, pending again."""
+    past = format_time(datetime.now(KOLKATA).replace(tzinfo=None) - timedelta(minutes=1))
+    for section, count in (("tasks", (k + 1) // 2), ("events", k // 2)):
+        ids = [f"{section}-{i}" for i in range(count)]
+        database[section].update_many({"id": {"$in": ids}}, {"$set": {"status": "pending", "reminder_time": past}})
+
+
+def _per_item():
+    """The previous /check_reminders body."""
+    memory = memory_manager.load_items()
+    now = datetime.now(KOLKATA)
+    fired = []
+    for section in ["tasks", "events"]:
+        for item in memory.get(section, []):
+            if item.pending and item.due <= now:
+                fired.append(item)
+                mark_notified(item.id, section)
+    return fired
+
+
+def _time(database, k, check):
+    _make_due(database, k)
+    memory_manager._bump_version()   # cold snapshot, as after any other write
+    start = time.perf_counter()
+    fired = check()
+    elapsed = time.perf_counter() - start
+    assert len(fired) == k, (len(fired), k)
+    assert not check(), "a second poll must find nothing"
+    return elapsed * 1000
+
+
+def _race(database, k, pollers):
+    _make_due(database, k)
+    with ThreadPoolExecutor(pollers) as pool:
+        batches = list(pool.map(lambda _: memory_manager.claim_due_reminders(), range(pollers)))
+    ids = [item.id for batch in batches for item in batch]
+    return len(ids), len(set(ids)), sum(1 for batch in batches if batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--mongo", help="MongoDB URL to benchmark instead of the embedded store")
+    args = parser.parse_args()
+
+    if args.mongo:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo, serverSelectionTimeoutMS=5000)
+        client.drop_database("smart_assistant_bench")
+        database = client["smart_assistant_bench"]
+    else:
+        database = LocalDatabase(os.path.join(tempfile.mkdtemp(prefix="check-reminders-"), "bench.sqlite3"))
+    memory_manager.tasks_collection = database["tasks"]
+    memory_manager.events_collection = database["events"]
+    memory_manager._text_index_ready = False
+
+    print(f"seeding {args.items} items ({'mongo' if args.mongo else 'sqlite'})...")
+    _seed(database, args.items)
+    print(f"{'due':>6} {'per-item ms':>12} {'set-based ms':>13} {'speedup':>8}")
+    for k in DUE_COUNTS:
+        before = _time(database, k, _per_item)
+        after = _time(database, k, memory_manager.claim_due_reminders)
+        print(f"{k:>6} {before:>12.1f} {after:>13.1f} {before / after:>7.1f}x")
+
+    k = DUE_COUNTS[-1]
+    reported, unique, winners = _race(database, k, args.pollers)
+    status = "ok" if reported == unique == k else "FAILED"
+    print(f"{args.pollers} concurrent pollers, {k} due: {reported} reported, {unique} unique, "
+          f"{winners} poller(s) got some  {status}")
+
+    if args.mongo:
+        client.drop_database("smart_assistant_bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Accuracy and speed of date_parser_helper.extract_time against the previous
+dateparser-only path, on a labelled corpus at a fixed reference time.
+
+    python -m benchmarks.bench_extract_time
+"""
+import time
+from datetime import datetime
+from agent import date_parser_helper
+from agent.date_parser_helper import extract_time
+
+# Wednesday, 10:00 Asia/Kolkata
+REFERENCE = datetime(2025, 1, 15, 10, 0)
+
+CORPUS = [
+    ("tomorrow at 5pm", datetime(2025, 1, 16, 17, 0)),
+    ("remind me to call mom tomorrow at 5pm", datetime(2025, 1, 16, 17, 0)),
+    ("submit report in 2 hours", datetime(2025, 1, 15, 12, 0)),
+    ("in 30 minutes", datetime(2025, 1, 15, 10, 30)),
+    ("call john in 3 days", datetime(2025, 1, 18, 10, 0)),
+    ("next monday 9am", datetime(2025, 1, 20, 9, 0)),
+    ("meeting next monday at 9am", datetime(2025, 1, 20, 9, 0)),
+    ("friday at 3pm", datetime(2025, 1, 17, 15, 0)),
+    ("dentist on friday", datetime(2025, 1, 17, 0, 0)),
+    ("this friday 4pm", datetime(2025, 1, 17, 16, 0)),
+    ("team meeting at 10:30", datetime(2025, 1, 15, 10, 30)),
+    ("today at 6 pm", datetime(2025, 1, 15, 18, 0)),
+    ("at 7:15 am gym", datetime(2025, 1, 16, 7, 15)),
+    ("meeting at noon", datetime(2025, 1, 15, 12, 0)),
+    ("in an hour", datetime(2025, 1, 15, 11, 0)),
+    ("call mom tonight at 9", datetime(2025, 1, 15, 21, 0)),
+    ("dinner tonight at 8", datetime(2025, 1, 15, 20, 0)),
+    ("call at 7 tonight", datetime(2025, 1, 15, 19, 0)),
+    ("dinner tonight", datetime(2025, 1, 15, 20, 0)),
+    ("meeting this evening at 7", datetime(2025, 1, 15, 19, 0)),
+    ("drinks at 6 in the evening", datetime(2025, 1, 15, 18, 0)),
+    ("party tomorrow night at 10", datetime(2025, 1, 16, 22, 0)),
+    ("gym tomorrow morning", datetime(2025, 1, 16, 9, 0)),
+    ("standup tomorrow morning at 9:30", datetime(2025, 1, 16, 9, 30)),
+    ("5th November 3:30pm", datetime(2025, 11, 5, 15, 30)),
+    ("birthday on 12 december", datetime(2025, 12, 12, 0, 0)),
+    ("buy milk", None),
+    ("hello how are you", None),
+    ("clean the kitchen", None),
+    ("tell me a joke", None),
+    ("buy 2 apples", None),
+    ("what's the weather like", None),
+    ("send the assignment", None),
+]
+REPEAT = 3
+
+
+def legacy_extract_time(text):
+    """The previous implementation (dateparser on every message), pinned to REFERENCE."""
+    import dateparser
+    from dateparser.search import search_dates
+
+    settings = {
+        "PREFER_DATES_FROM": "future",
+        "TIMEZONE": "Asia/Kolkata",
+        "RETURN_AS_TIMEZONE_AWARE": False,
+        "RELATIVE_BASE": REFERENCE,
+    }
+    parsed_time = dateparser.parse(text, settings=settings)
+    if parsed_time:
+        return parsed_time
+    try:
+        results = search_dates(text, settings=settings)
+        if results:
+            return results[0][1]
+    except Exception:
+        pass
+    return None
+
+
+def _score(fn):
+    correct = sum(1 for text, expected in CORPUS if fn(text) == expected)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for text, _ in CORPUS:
+            fn(text)
+    elapsed = (time.perf_counter() - start) / (REPEAT * len(CORPUS))
+    return correct, elapsed
+
+
+def _new_cold(text):
+    date_parser_helper._date_cache.clear()
+    return extract_time(text, now=REFERENCE)
+
+
+def main():
+    legacy_extract_time("warm up dateparser tomorrow")
+    print(f"{'path':<26} {'accuracy':>9} {'mean ms/msg':>12}")
+    for label, fn in [
+        ("dateparser (previous)", legacy_extract_time),
+        ("fast path, cold cache", _new_cold),
+        ("fast path, warm cache", lambda t: extract_time(t, now=REFERENCE)),
+    ]:
+        correct, elapsed = _score(fn)
+        print(f"{label:<26} {correct:>4}/{len(CORPUS):<4} {elapsed * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cost of the queries memory_manager issues, on a large collection, with no
+secondary indexes and then with agent.db.INDEXES in place.
+
+By default this runs against the embedded SQLite store. With --mongo it
+runs against a scratch database on that server, which is dropped
+afterwards, and also reports documents examined from explain().
+
+    python -m benchmarks.bench_indexes [--docs 100000] [--mongo URL]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from agent import memory_manager
+from agent.db import INDEXES
+from agent.local_store import LocalDatabase
+
+TARGET_SECONDS = 0.3
+_STATUSES = ["pending"] * 6 + ["notified"] * 2 + ["completed", "firing"]
+
+
+def _seed(collection, n):
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    docs = []
+    for i in range(n):
+        doc = {
+            "id": f"{i:032x}",
+            "text": f"item {i} about {rng.choice(['milk', 'rent', 'gym', 'taxes', 'dentist'])}",
+            "status": rng.choice(_STATUSES),
+            "source": "regex",
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+        }
+        doc["text_norm"] = doc["text"]
+        if rng.random() < 0.3:
+            doc["reminder_time"] = (start + timedelta(minutes=rng.randrange(2 * n))).strftime("%Y-%m-%d %H:%M")
+        docs.append(doc)
+    for i in range(0, n, 10000):
+        collection.insert_many(docs[i:i + 10000], ordered=False)
+
+
+def _queries(n):
+    middle = f"{n // 2:032x}"
+    due_by = (datetime(2025, 1, 1) + timedelta(minutes=n // 100)).strftime("%Y-%m-%d %H:%M")
+    page_order = memory_manager._PAGE_ORDER
+    return [
+        ("pending reminders", lambda c: list(c.find(
+            {"reminder_time": {"$exists": True}, "status": {"$nin": ["completed", "notified"]}}, {"_id": 0}))),
+        ("due reminders", lambda c: list(c.find(
+            {"reminder_time": {"$lte": due_by}, "$or": memory_manager._claimable(time.time())}, {"_id": 0}))),
+        ("page by status", lambda c: list(c.find({"status": "firing"}, {"_id": 0}).sort(page_order).limit(100))),
+        ("first page", lambda c: list(c.find({}, {"_id": 0}).sort(page_order).limit(100))),
+        ("update by id", lambda c: c.update_one({"id": middle}, {"$set": {"source": "regex"}})),
+        ("exact text", lambda c: c.find_one({"text_norm": f"item {n // 3} about milk"}, {"_id": 0})),
+    ]
+
+
+def _explain(collection, label):
+    """Documents examined per query (MongoDB only)."""
+    shapes = {
+        "pending reminders": {"reminder_time": {"$exists": True}, "status": {"$nin": ["completed", "notified"]}},
+        "page by status": {"status": "firing"},
+        "exact text": {"text_norm": "item 1 about milk"},
+    }
+    if label not in shapes:
+        return None
+    stats = collection.find(shapes[label]).explain().get("executionStats", {})
+    return stats.get("totalDocsExamined")
+
+
+def _time(fn, collection):
+    fn(collection)  # warm (mirror load / plan cache)
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn(collection)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed > TARGET_SECONDS or runs >= 1000:
+            return elapsed / runs * 1000
+
+
+def _measure(collection, n, mongo):
+    return {label: (_time(fn, collection), _explain(collection, label) if mongo else None)
+            for label, fn in _queries(n)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--mongo", help="MongoDB URL to benchmark instead of the embedded store")
+    args = parser.parse_args()
+
+    if args.mongo:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo, serverSelectionTimeoutMS=5000)
+        client.drop_database("smart_assistant_bench")
+        database = client["smart_assistant_bench"]
+    else:
+        database = LocalDatabase(os.path.join(tempfile.mkdtemp(prefix="index-bench-"), "bench.sqlite3"))
+    collection = database["tasks"]
+
+    print(f"seeding {args.docs} documents ({'mongo' if args.mongo else 'sqlite'})...")
+    _seed(collection, args.docs)
+    collection.drop_indexes()
+    before = _measure(collection, args.docs, args.mongo)
+    for section, keys in INDEXES:
+        if section == "tasks":
+            collection.create_index(keys)
+    after = _measure(collection, args.docs, args.mongo)
+
+    print(f"{'query':<20} {'before ms':>10} {'after ms':>10} {'speedup':>8}" + (f" {'examined':>19}" if args.mongo else ""))
+    for label, (ms_before, seen_before) in before.items():
+        ms_after, seen_after = after[label]
+        line = f"{label:<20} {ms_before:>10.3f} {ms_after:>10.3f} {ms_before / ms_after:>7.1f}x"
+        if args.mongo and seen_before is not None:
+            line += f" {seen_before:>9} -> {seen_after:<7}"
+        print(line)
+
+    if args.mongo:
+        client.drop_database("smart_assistant_bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: compiled single-pass IntentClassifier versus the previous
+per-pattern re.search loop in process_message.
+
+    python -m benchmarks.bench_intent
+"""
+import os
+import re
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+
+from agent.llm_agent import COMPLETE_PATTERNS, TASK_PATTERNS, EVENT_PATTERNS, MESSAGE_CLASSIFIER
+
+MESSAGES = [
+    "buy milk and curd",
+    "submit the assignment tomorrow",
+    "remind me to call mom at 6 pm",
+    "team meeting on friday at 10:30",
+    "groceries done",
+    "finished the report",
+    "how are you today?",
+    "what's the weather like",
+    "schedule a zoom call with the design team",
+    "join the conference session next week",
+    "clean the kitchen",
+    "tell me a joke",
+]
+REPEAT = 5_000
+
+
+def legacy_classify(msg_lower):
+    if any(re.search(p, msg_lower) for p in COMPLETE_PATTERNS):
+        return "complete"
+    if any(re.search(p, msg_lower) for p in TASK_PATTERNS):
+        return "task"
+    if any(re.search(p, msg_lower) for p in EVENT_PATTERNS):
+        return "event"
+    return "chat"
+
+
+def _time(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e6 / n:8.2f} µs/msg")
+
+
+def main():
+    corpus = [m.lower() for m in MESSAGES] * REPEAT
+
+    mismatches = [m for m in MESSAGES if legacy_classify(m.lower()) != MESSAGE_CLASSIFIER.classify(m.lower()).intent]
+    print(f"agreement: {len(MESSAGES) - len(mismatches)}/{len(MESSAGES)}")
+
+    _time("per-pattern re.search", lambda: [legacy_classify(m) for m in corpus], len(corpus))
+    _time("IntentClassifier.classify", lambda: [MESSAGE_CLASSIFIER.classify(m) for m in corpus], len(corpus))
+    _time("IntentClassifier.classify_many", lambda: MESSAGE_CLASSIFIER.classify_many(corpus), len(corpus))
+
+
+if __name__ == "__main__":
+    main()
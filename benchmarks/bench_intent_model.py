@@ -0,0 +1,143 @@
+"""
+The local intent model on held-out messages that the regex rules miss
+(the ones that used to go to Groq): how many LLM calls it avoids at each
+confidence threshold, how accurate its own answers are, and how long it
+takes per message, alone and in batches.
+
+The corpus is generated from templates, with a labelled intent per
+message. Three templates per intent and a third of the fillers never
+appear in training, so the held-out set mixes familiar messages with
+phrasings and words the model has not seen. Training mirrors production: the seed
+set, a store of task/event phrases, and earlier fallback messages with
+the LLM's verdicts.
+
+    python -m benchmarks.bench_intent_model [messages]
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+
+from agent.intent_model import IntentModel, SEED_EXAMPLES
+from agent.llm_agent import MESSAGE_CLASSIFIER
+
+THRESHOLDS = [0.5, 0.7, 0.8, 0.9, 0.95, 0.99]
+
+TEMPLATES = {
+    "task": [
+        "pick up {thing} from {place}", "pay the {bill} bill", "renew my {document}",
+        "order {thing} online", "fix the {thing}", "return {thing} to {person}",
+        "book a {service} for {day}", "get {thing} for {person}", "water the {plant}",
+        "email {person} about {topic}",
+    ],
+    "event": [
+        "dinner with {person} {day}", "{person}'s wedding {day}", "dentist {day} evening",
+        "flight to {city} {day}", "interview with {company} {day}", "webinar about {topic} {day}",
+        "{person}'s farewell party {day}", "doctor appointment {day}", "concert in {city} {day}",
+        "parent teacher meeting {day}",
+    ],
+    "complete": [
+        "paid the {bill} bill", "picked up {thing} already", "renewed my {document}",
+        "{thing} is sorted", "got {thing} for {person}", "returned {thing} to {person}",
+        "the {plant} is watered", "already emailed {person}", "fixed the {thing} finally",
+        "took care of the {bill} bill",
+    ],
+    "chat": [
+        "hi {person}", "how are you doing {day}", "what do you think about {topic}",
+        "tell me something about {city}", "thanks {person}", "good morning {person}",
+        "who won the match {day}", "what is {topic}", "can you explain {topic}",
+        "i feel tired {day}",
+    ],
+}
+FILLERS = {
+    "thing": ["the parcel", "groceries", "a charger", "the laptop", "new shoes", "the keys", "a gift",
+              "the tickets", "the prescription", "a blender", "the bicycle", "paint", "a lamp", "the mail"],
+    "place": ["the post office", "the pharmacy", "amazon locker", "the mall", "the station", "the bank"],
+    "bill": ["electricity", "water", "internet", "phone", "gas", "credit card", "rent", "insurance"],
+    "document": ["passport", "licence", "visa", "insurance policy", "gym membership", "id card"],
+    "person": ["priya", "rahul", "mom", "dad", "anita", "the landlord", "sam", "neha", "arjun", "the boss"],
+    "service": ["cab", "haircut", "plumber", "table", "car wash", "massage"],
+    "day": ["tomorrow", "tonight", "next monday", "on friday", "this weekend", "next month", "today", "sunday"],
+    "plant": ["plants", "garden", "lawn", "roses", "tulsi"],
+    "topic": ["black holes", "the budget", "cricket", "python", "the elections", "climate change", "taxes"],
+    "city": ["delhi", "mumbai", "goa", "pune", "london", "dubai", "chennai"],
+    "company": ["google", "infosys", "a startup", "tcs", "the bank"],
+}
+
+
+def _corpus(n, rng, templates, fillers):
+    messages = []
+    while len(messages) < n:
+        label = rng.choice(list(templates))
+        template = rng.choice(templates[label])
+        text = template.format(**{k: rng.choice(v) for k, v in fillers.items()})
+        # Only what the regex rules miss would ever reach the model
+        if MESSAGE_CLASSIFIER.classify(text).intent == "chat":
+            messages.append((text, label))
+    return messages
+
+
+def _split(rng, table, keep):
+    seen, unseen = {}, {}
+    for key, values in table.items():
+        values = values[:]
+        rng.shuffle(values)
+        cut = keep(len(values))
+        seen[key], unseen[key] = values[:cut], values[cut:]
+    return seen, unseen
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    rng = random.Random(11)
+    templates, new_templates = _split(rng, TEMPLATES, lambda k: k - 3)
+    fillers, new_fillers = _split(rng, FILLERS, lambda k: max(1, k * 2 // 3))
+    everything = {key: fillers[key] + new_fillers[key] for key in FILLERS}
+    train = _corpus(n, rng, templates, fillers)
+    held_out = _corpus(n // 2, rng, TEMPLATES, everything)
+    store = [(" ".join(text.split()[:4]), label) for text, label in train[: n // 4] if label in ("task", "event")]
+
+    start = time.perf_counter()
+    model = IntentModel(SEED_EXAMPLES)
+    model.learn_many(store)
+    model.learn_many(train)
+    model.fit()
+    fit_ms = (time.perf_counter() - start) * 1000
+
+    texts = [text for text, _ in held_out]
+    labels = [label for _, label in held_out]
+    predictions = model.predict_many(texts)
+    for (intent, prob), text in zip(predictions[:50], texts):
+        single = model.predict(text)
+        assert intent == single[0] and abs(prob - single[1]) < 1e-9
+
+    print(f"trained on {len(model)} examples ({len(model._vocab)} features) in {fit_ms:.0f} ms; "
+          f"{len(held_out)} held-out regex misses")
+    print(f"{'threshold':>9} {'LLM calls':>10} {'avoided':>8} {'local accuracy':>15} {'end-to-end':>11}")
+    print(f"{'(none)':>9} {len(texts):>10} {'0%':>8} {'-':>15} {'(LLM)':>11}")
+    for threshold in THRESHOLDS:
+        local = [(p, label) for (p, prob), label in zip(predictions, labels) if prob >= threshold]
+        right = sum(p == label for p, label in local)
+        calls = len(texts) - len(local)
+        # Escalated messages are counted as answered correctly by the LLM
+        end_to_end = (right + calls) / len(texts)
+        accuracy = f"{right / len(local):.1%}" if local else "-"
+        print(f"{threshold:>9} {calls:>10} {len(local) / len(texts):>8.0%} {accuracy:>15} {end_to_end:>11.1%}")
+
+    single = []
+    for text in texts[:2000]:
+        t0 = time.perf_counter()
+        model.predict(text)
+        single.append(time.perf_counter() - t0)
+    single.sort()
+    t0 = time.perf_counter()
+    model.predict_many(texts)
+    batch = (time.perf_counter() - t0) / len(texts)
+    print(f"predict(): p50 {single[len(single) // 2] * 1e6:.1f} us, p99 {single[int(len(single) * .99)] * 1e6:.1f} us; "
+          f"predict_many({len(texts)}): {batch * 1e6:.1f} us/message")
+
+
+if __name__ == "__main__":
+    main()
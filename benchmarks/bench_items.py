@@ -0,0 +1,98 @@
+"""
+Memory and throughput of the Item model against the loose dicts it
+replaced, at 10^5 items: resident size of the snapshot, and the per-pass
+work the pipeline repeats (snapshot hand-out, due-reminder scan, scheduler
+seeding).
+
+    python -m benchmarks.bench_items [items]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from agent.date_parser_helper import KOLKATA, parse_reminder_time
+from agent.item import Item
+from agent.scheduler import ReminderScheduler
+
+
+def _docs(n):
+    start = datetime(2025, 1, 1)
+    docs = []
+    for i in range(n):
+        doc = {
+            "id": f"{i:032x}",
+            "text": f"buy groceries and call the plumber {i}",
+            "status": "pending" if i % 4 else "notified",
+            "source": "regex",
+            "created_at": (start + timedelta(seconds=i)).isoformat(),
+        }
+        doc["text_norm"] = doc["text"]
+        if i % 2:
+            doc["reminder_time"] = (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M")
+        docs.append(doc)
+    return docs
+
+
+def _resident(build):
+    """Bytes allocated by build() that are still alive afterwards."""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, size
+
+
+def _time(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    raw = _docs(n)
+    # The stored documents as a driver hands them over (fresh dicts, shared nothing).
+    dicts, dict_bytes = _resident(lambda: [dict(doc) for doc in raw])
+    items, item_bytes = _resident(lambda: [Item.from_doc(doc, "task") for doc in raw])
+    now = datetime(2025, 3, 1, tzinfo=KOLKATA)
+
+    def dict_due():
+        return [d for d in dicts if d.get("reminder_time") and d["status"] not in ("completed", "notified")
+                and parse_reminder_time(d["reminder_time"]) <= now]
+
+    def item_due():
+        return [item for item in items if item.pending and item.due <= now]
+
+    def dict_seed():
+        scheduler = ReminderScheduler()
+        for d in dicts:
+            if d.get("reminder_time"):
+                scheduler.schedule(d["id"], d["reminder_time"], {"section": "tasks", "text": d["text"]})
+
+    def item_seed():
+        scheduler = ReminderScheduler()
+        for item in items:
+            if item.pending:
+                scheduler.schedule(item.id, item.due, item)
+
+    assert len(dict_due()) == len(item_due())
+    rows = [
+        ("resident MB", dict_bytes / 1e6, item_bytes / 1e6),
+        ("snapshot hand-out ms", _time(lambda: [dict(d) for d in dicts]), _time(lambda: list(items))),
+        ("due-reminder scan ms", _time(dict_due), _time(item_due)),
+        ("scheduler seed ms", _time(dict_seed, 1), _time(item_seed, 1)),
+        ("build from docs ms", _time(lambda: [dict(d) for d in raw]), _time(lambda: [Item.from_doc(d, "task") for d in raw])),
+    ]
+    print(f"{n} items")
+    print(f"{'':<22} {'dicts':>10} {'Items':>10} {'ratio':>7}")
+    for label, before, after in rows:
+        print(f"{label:<22} {before:>10.1f} {after:>10.1f} {before / after:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+N gunicorn workers firing the same due reminders, simulated in one process:
+every worker seeds its own scheduler from the shared store, as at boot.
+Compares the old fire path (mark_notified + broadcast in every worker) with
+claim -> broadcast -> finish, counting broadcasts and store writes.
+
+    python -m benchmarks.bench_reminder_claims [workers] [reminders]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from agent import memory_manager
+from agent.date_parser_helper import KOLKATA, format_time
+from agent.scheduler import ReminderScheduler
+from benchmarks.fakes import FakeCollection, mark_notified
+
+
+def _seed(n):
+    memory_manager.tasks_collection = FakeCollection()
+    memory_manager.events_collection = FakeCollection()
+    due = format_time(datetime.now(KOLKATA).replace(tzinfo=None) - timedelta(minutes=1))
+    memory_manager.tasks_collection.insert_many([
+        {"id": f"r{i}", "text": f"reminder {i}", "status": "pending", "reminder_time": due}
+        for i in range(n)
+    ])
+
+
+def _legacy_fire(worker, counts):
+    async def fire(item_id, item):
+        mark_notified(item_id, item.section)
+        counts["broadcasts"] += 1
+    return fire
+
+
+def _claim_fire(worker, counts):
+    async def fire(item_id, item):
+        if memory_manager.claim_reminder(item_id, item.section, owner=worker) is None:
+            return
+        counts["broadcasts"] += 1
+        memory_manager.finish_reminder(item_id, item.section, owner=worker)
+    return fire
+
+
+async def _run(workers, n, make_fire):
+    _seed(n)
+    counts = {"broadcasts": 0}
+    schedulers = []
+    for w in range(workers):
+        scheduler = ReminderScheduler()
+        for item in memory_manager.get_pending_reminders():
+            scheduler.schedule(item.id, item.due, item)
+        schedulers.append((scheduler, make_fire(f"worker-{w}", counts)))
+    memory_manager.tasks_collection.writes = 0
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(s.run(fire)) for s, fire in schedulers]
+    while any(len(s) for s, _ in schedulers):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return counts["broadcasts"], memory_manager.tasks_collection.writes, elapsed
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"{workers} workers, {n} due reminders")
+    print(f"{'fire path':<22} {'broadcasts':>10} {'writes':>8} {'ms':>8}")
+    for label, make_fire in [("every worker (old)", _legacy_fire), ("atomic claim", _claim_fire)]:
+        broadcasts, writes, elapsed = asyncio.run(_run(workers, n, make_fire))
+        print(f"{label:<22} {broadcasts:>10} {writes:>8} {elapsed * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
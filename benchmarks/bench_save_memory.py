@@ -0,0 +1,62 @@
+"""
+Write volume of memory_manager.save_memory versus dataset size.
+
+Compares the old delete_many/insert_many rewrite with the diff-based
+bulk_write path when a single item changes (the reminder-fired case).
+
+    python -m benchmarks.bench_save_memory
+"""
+import time
+import uuid
+from agent import memory_manager
+from benchmarks.fakes import FakeCollection
+
+SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def _seed(collection, n):
+    for i in range(n):
+        collection.insert_one({
+            "id": uuid.uuid4().hex,
+            "text": f"item {i}",
+            "status": "pending",
+            "source": "regex",
+        })
+    collection.writes = 0
+
+
+def _legacy_save(memory):
+    # The pre-diff implementation, kept here as the baseline.
+    memory_manager.tasks_collection.delete_many({})
+    memory_manager.events_collection.delete_many({})
+    memory_manager.tasks_collection.insert_many(memory["tasks"])
+    memory_manager.events_collection.insert_many(memory["events"])
+
+
+def _run(n, save):
+    memory_manager.tasks_collection = FakeCollection()
+    memory_manager.events_collection = FakeCollection()
+    _seed(memory_manager.tasks_collection, n // 2)
+    _seed(memory_manager.events_collection, n - n // 2)
+    memory_manager._bump_version()   # new collections: drop the previous run's snapshot
+
+    memory = memory_manager.load_memory()
+    memory["tasks"][0]["status"] = "notified"
+
+    start = time.perf_counter()
+    save(memory)
+    elapsed = time.perf_counter() - start
+    writes = memory_manager.tasks_collection.writes + memory_manager.events_collection.writes
+    return writes, elapsed
+
+
+def main():
+    print(f"{'items':>8} | {'legacy writes':>13} {'legacy ms':>10} | {'diff writes':>11} {'diff ms':>8}")
+    for n in SIZES:
+        legacy_writes, legacy_t = _run(n, _legacy_save)
+        diff_writes, diff_t = _run(n, memory_manager.save_memory)
+        print(f"{n:>8} | {legacy_writes:>13} {legacy_t * 1000:>10.1f} | {diff_writes:>11} {diff_t * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+/send under concurrent load in each PIPELINE_MODE. Messages are posted on
+a fixed schedule (open loop: message n is due at n / rate seconds, however
+the earlier ones are doing) and each latency is measured from when it was
+due, so a mode that falls behind shows it in its tail instead of quietly
+offering less load; every mode gets the same schedule. Meanwhile a probe
+sleeps 10 ms at a time on the event loop; how late it wakes up is how long
+every other request (and WebSocket push) would have stalled.
+
+The Groq stub sleeps to model the network round-trip; dated messages in
+forms the fast path does not handle exercise dateparser's CPU cost.
+
+    python -m benchmarks.bench_send_concurrency [messages] [rate_per_s] [groq_ms] [workers]
+"""
+import asyncio
+import os
+import sys
+import time
+from functools import partial
+
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+
+import httpx
+from agent import llm_cache, memory_manager, pipeline
+from benchmarks.fakes import FakeCollection, FakeGroq
+
+MODES = ["inline", "thread", "process"]
+PROBE_INTERVAL = 0.01
+_FORMS = [
+    "buy the groceries {i} tomorrow at 5pm",
+    "design conference {i} on 5th November 3:30pm",
+    "hello there number {i}",
+    "submit report {i}",
+    "birthday party {i} 12 december",
+    "tell me something about {i}",
+]
+
+
+def install_fake_groq(latency):
+    """Also the process-pool worker_init, so it must stay importable."""
+    llm_cache.set_client(FakeGroq(latency))
+    llm_cache.completion_cache.clear()
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def _run(mode, total, rate, groq_latency, workers):
+    import app
+
+    memory_manager.tasks_collection = FakeCollection()
+    memory_manager.events_collection = FakeCollection()
+    memory_manager._text_index_ready = False
+    install_fake_groq(groq_latency)
+    pipeline.configure(mode=mode, workers=workers, worker_init=partial(install_fake_groq, groq_latency))
+    await pipeline.start()
+
+    send_latencies, loop_lag = [], []
+    done = asyncio.Event()
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def sender(n):
+            due = start + n / rate
+            await asyncio.sleep(due - time.perf_counter())
+            message = _FORMS[n % len(_FORMS)].format(i=f"{mode}{n}")
+            response = await client.post("/send", json={"message": message})
+            response.raise_for_status()
+            send_latencies.append(time.perf_counter() - due)
+
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await asyncio.sleep(PROBE_INTERVAL)
+                loop_lag.append(time.perf_counter() - t0 - PROBE_INTERVAL)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(sender(n) for n in range(total)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    pipeline.shutdown()
+    return elapsed, send_latencies, loop_lag
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 40.0
+    groq_latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.05
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    print(f"{total} messages offered at {rate:g}/s, Groq stub {groq_latency * 1000:.0f} ms, {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<8} {'workers':>7} {'msg/s':>8} {'send p50':>10} {'send p99':>10} {'loop lag p99':>13} {'max':>8}")
+    for mode in MODES:
+        elapsed, sends, lag = asyncio.run(_run(mode, total, rate, groq_latency, workers))
+        shown = pipeline.stats()['workers'] if mode != "inline" else "-"
+        print(f"{mode:<8} {shown:>7} {total / elapsed:>8.1f} "
+              f"{_percentile(sends, .5):>8.0f}ms {_percentile(sends, .99):>8.0f}ms "
+              f"{_percentile(lag, .99):>11.1f}ms {max(lag) * 1000:>6.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
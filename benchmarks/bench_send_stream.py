@@ -0,0 +1,114 @@
+"""
+Time to first byte of /send against /send/stream, over a real socket
+(httpx's ASGITransport buffers whole responses, so it cannot show this).
+
+The Groq stub waits `groq_ms` before its first token and `token_ms` per
+word after that. For each message form this reports when /send answers,
+when /send/stream delivers its first event and its classification, and
+when it finishes.
+
+    python -m benchmarks.bench_send_stream [rounds] [groq_ms] [token_ms]
+"""
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+
+import httpx
+import uvicorn
+from agent import llm_cache, memory_manager, pipeline
+from benchmarks.fakes import FakeCollection, FakeGroq
+
+CHAT_REPLY = ("That sounds like general conversation rather than something to track, "
+              "so I will just keep chatting with you about it for now.")
+FORMS = [
+    ("regex task", "submit report {i}"),
+    ("regex event, LLM keywords", "birthday party {i} 12 december"),
+    ("LLM fallback (chat)", "tell me something about {i}"),
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _plain(client, message):
+    start = time.perf_counter()
+    response = await client.post("/send", json={"message": message})
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, elapsed
+
+
+async def _streamed(client, message):
+    start = time.perf_counter()
+    first = classified = None
+    event = None
+    async with client.stream("POST", "/send/stream", json={"message": message}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first is None:
+                first = time.perf_counter() - start
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "classification" and classified is None:
+                classified = time.perf_counter() - start
+            elif line.startswith("data: ") and event == "error":
+                raise RuntimeError(json.loads(line[6:]))
+    return first, classified, time.perf_counter() - start
+
+
+async def _run(rounds, groq_latency, token_latency):
+    import app
+
+    memory_manager.tasks_collection = FakeCollection()
+    memory_manager.events_collection = FakeCollection()
+    memory_manager._text_index_ready = False
+    llm_cache.set_client(FakeGroq(groq_latency, token_latency, CHAT_REPLY))
+    llm_cache.completion_cache.clear()
+    pipeline.configure(mode="thread")
+    await pipeline.start()
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app.app, port=port, lifespan="off", log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    results = {}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        n = 0
+        for label, form in FORMS:
+            for name, call in (("/send", _plain), ("/send/stream", _streamed)):
+                samples = []
+                for _ in range(rounds):
+                    n += 1   # a fresh message each time, so the LLM cache never answers
+                    samples.append(await call(client, form.format(i=f"n{n}")))
+                results[label, name] = [sorted(column)[len(column) // 2] for column in zip(*samples)]
+
+    server.should_exit = True
+    await serving
+    pipeline.shutdown()
+    return results
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    groq_latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.3
+    token_latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    results = asyncio.run(_run(rounds, groq_latency, token_latency))
+
+    print(f"median of {rounds}, Groq stub {groq_latency * 1000:.0f} ms + {token_latency * 1000:.0f} ms/token")
+    print(f"{'message':<27} {'endpoint':<13} {'first byte':>11} {'classified':>11} {'complete':>9}")
+    for (label, name), (first, classified, total) in results.items():
+        print(f"{label:<27} {name:<13} {first * 1000:>9.0f}ms {classified * 1000:>9.0f}ms {total * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
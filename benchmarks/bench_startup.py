@@ -0,0 +1,47 @@
+"""
+Import-to-ready time for `app:app`: a fresh interpreter imports the app and
+runs its lifespan startup, the same work each gunicorn worker does on boot.
+
+    python -m benchmarks.bench_startup [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.app):
+    t2 = time.perf_counter()
+print(f"STARTUP {t1 - t0:.4f} {t2 - t0:.4f}")
+"""
+
+
+def _run_once():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    line = next(l for l in out.splitlines() if l.startswith("STARTUP"))
+    _, imported, ready = line.split()
+    return float(imported), float(ready)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    samples = [_run_once() for _ in range(runs)]
+    imports = [s[0] for s in samples]
+    ready = [s[1] for s in samples]
+    print(f"runs: {runs}")
+    print(f"import app        median {statistics.median(imports) * 1000:8.1f} ms  min {min(imports) * 1000:8.1f} ms")
+    print(f"import-to-ready   median {statistics.median(ready) * 1000:8.1f} ms  min {min(ready) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
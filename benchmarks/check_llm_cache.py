@@ -0,0 +1,142 @@
+"""
+Checks the Groq completion cache against benchmarks.fakes.FakeGroq, no
+network needed: hits on normalised prompts, coalescing of concurrent
+misses, TTL expiry, LRU eviction, and that empty replies and errors are
+never cached. Also checks that a streamed reply shares the same cache.
+
+    python -m benchmarks.check_llm_cache [--concurrency 16]
+
+Exits with 1 if any check fails.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from agent import llm_cache
+from agent.llm_cache import LLMCache, chat_completion, stream_chat_completion
+from benchmarks.fakes import FakeGroq
+
+SYSTEM = "You are a helpful assistant."
+MODEL = "fake-model"
+
+
+def _use(groq, **cache_options):
+    llm_cache.set_client(groq)
+    llm_cache.completion_cache = LLMCache(**cache_options)
+    return llm_cache.completion_cache
+
+
+class _FailingGroq(FakeGroq):
+    def _create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        raise RuntimeError("upstream unavailable")
+
+
+def check_coalescing(n):
+    groq = FakeGroq(latency=0.5, chat_reply="hello")
+    cache = _use(groq)
+    with ThreadPoolExecutor(n) as pool:
+        replies = list(pool.map(lambda _: chat_completion(SYSTEM, "tell me a joke", MODEL), range(n)))
+    stats = cache.stats()
+    return (groq.calls == 1 and stats["coalesced"] == n - 1 and set(replies) == {"hello"},
+            f"{n} concurrent -> {groq.calls} upstream call(s), {stats['coalesced']} coalesced")
+
+
+def check_hits():
+    groq = FakeGroq(chat_reply="hello")
+    cache = _use(groq)
+    for prompt in ("Tell me a joke!", "tell me  a joke", "TELL ME A JOKE?"):
+        chat_completion(SYSTEM, prompt, MODEL)
+    other_model = chat_completion(SYSTEM, "tell me a joke", "other-model")
+    stats = cache.stats()
+    return (groq.calls == 2 and stats["hits"] == 2 and other_model == "hello",
+            f"3 spellings + 1 other model -> {groq.calls} upstream calls, {stats['hits']} hits")
+
+
+def check_ttl():
+    groq = FakeGroq(chat_reply="hello")
+    cache = _use(groq, ttl=0.2)
+    chat_completion(SYSTEM, "tell me a joke", MODEL)
+    chat_completion(SYSTEM, "tell me a joke", MODEL)
+    time.sleep(0.3)
+    chat_completion(SYSTEM, "tell me a joke", MODEL)
+    stats = cache.stats()
+    return (groq.calls == 2 and stats["hits"] == 1 and stats["misses"] == 2,
+            f"miss, hit, expire, miss -> {groq.calls} upstream calls, {stats['misses']} misses")
+
+
+def check_eviction():
+    groq = FakeGroq(chat_reply="hello")
+    cache = _use(groq, max_size=2)
+    for prompt in ("one", "two", "one", "three", "two"):
+        chat_completion(SYSTEM, prompt, MODEL)
+    stats = cache.stats()
+    # "one" was used more recently than "two", so "two" is evicted and fetched again
+    return (groq.calls == 4 and stats["evictions"] == 2 and stats["size"] == 2,
+            f"max_size 2, 3 prompts -> {groq.calls} upstream calls, {stats['evictions']} evictions")
+
+
+def check_empty_not_cached():
+    groq = FakeGroq(chat_reply="   ")
+    cache = _use(groq)
+    replies = [chat_completion(SYSTEM, "tell me a joke", MODEL) for _ in range(2)]
+    return (groq.calls == 2 and cache.stats()["size"] == 0 and replies == ["", ""],
+            f"empty reply twice -> {groq.calls} upstream calls, size {cache.stats()['size']}")
+
+
+def check_errors_not_cached(n):
+    groq = _FailingGroq(latency=0.2)
+    cache = _use(groq)
+
+    def call(_):
+        try:
+            chat_completion(SYSTEM, "tell me a joke", MODEL)
+        except RuntimeError:
+            return "raised"
+        return "returned"
+
+    with ThreadPoolExecutor(n) as pool:
+        outcomes = list(pool.map(call, range(n)))
+    first_calls = groq.calls
+    call(None)
+    return (first_calls == 1 and groq.calls == 2 and set(outcomes) == {"raised"} and cache.stats()["size"] == 0,
+            f"{n} concurrent on a failing upstream -> {first_calls} call, all raised; next call retries")
+
+
+def check_stream_shares_cache():
+    groq = FakeGroq(chat_reply="hello there friend")
+    cache = _use(groq)
+    first, second = [], []
+    streamed = stream_chat_completion(SYSTEM, "tell me a joke", MODEL, first.append)
+    plain = chat_completion(SYSTEM, "tell me a joke", MODEL)
+    cached = stream_chat_completion(SYSTEM, "Tell me a joke!", MODEL, second.append)
+    return (groq.calls == 1 and len(first) == 3 and second == [streamed] and plain == cached == streamed
+            and cache.stats()["hits"] == 2,
+            f"stream, plain, stream -> {groq.calls} upstream call; {len(first)} chunks, then {len(second)} from cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    checks = [
+        ("coalescing", lambda: check_coalescing(args.concurrency)),
+        ("hits", check_hits),
+        ("ttl", check_ttl),
+        ("eviction", check_eviction),
+        ("empty reply", check_empty_not_cached),
+        ("errors", lambda: check_errors_not_cached(args.concurrency)),
+        ("streaming", check_stream_shares_cache),
+    ]
+    ok = True
+    for label, check in checks:
+        passed, detail = check()
+        print(f"{label:<12} {'ok' if passed else 'FAILED'}  {detail}")
+        ok = ok and passed
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
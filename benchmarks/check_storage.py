@@ -0,0 +1,223 @@
+"""
+Runs one memory_manager scenario (adds, search, pagination, save diffs,
+reminder claims and polls, completion) against every storage backend and
+checks they all agree with the in-memory reference. Then times the embedded store's
+reads and checks its writes survive a reopen.
+
+    python -m benchmarks.check_storage [--docs N] [--mongo URL]
+
+--mongo runs the scenario against a scratch database on that server too.
+The database is dropped afterwards.
+Exits with 1 if any backend disagrees with the reference.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from agent import db as storage, memory_manager
+from agent.date_parser_helper import KOLKATA, format_time
+from agent.item import INTERNAL_FIELDS
+from agent.local_store import LocalDatabase
+from agent.text_index import TextIndex
+from benchmarks.fakes import FakeCollection
+
+
+class _FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def list_collection_names(self):
+        return list(self)
+
+
+def _use(db):
+    memory_manager.tasks_collection = db["tasks"]
+    memory_manager.events_collection = db["events"]
+    memory_manager.meta_collection = db["meta"]
+    for section, keys in storage.INDEXES:
+        if hasattr(db[section], "create_index"):
+            db[section].create_index(keys)
+    memory_manager._text_index = TextIndex()
+    memory_manager._text_index_ready = False
+    memory_manager._bump_version()
+
+
+def _texts(items):
+    return sorted(item.text for item in items)
+
+
+def _come_due(texts, when):
+    """Move these items' reminders into the past, as if they came due while the app was down."""
+    for collection in (memory_manager.tasks_collection, memory_manager.events_collection):
+        collection.update_many({"text": {"$in": texts}}, {"$set": {"reminder_time": when}})
+    memory_manager._bump_version()
+
+
+def _scenario():
+    """Every observable result, with generated ids replaced by item text."""
+    mm = memory_manager
+    now = datetime.now(KOLKATA).replace(tzinfo=None)
+    past, soon = format_time(now - timedelta(minutes=5)), now + timedelta(hours=1)
+    future = format_time(now + timedelta(days=1))
+    out = {}
+
+    mm.add_item({"text": "buy milk", "type": "task", "reminder_time": format_time(soon)})
+    out["add_items"] = [item and item.text for item in mm.add_items([
+        {"text": "buy groceries", "type": "task"},
+        {"text": "team offsite", "type": "event", "reminder_time": future},
+        {"text": "", "type": "task"},
+        {"text": "call mom", "type": "task", "reminder_time": format_time(soon)},
+        # ISO with a UTC offset: stored in the same sortable form
+        {"text": "renew visa", "type": "task",
+         "reminder_time": soon.replace(tzinfo=KOLKATA).astimezone(timezone.utc).isoformat()},
+    ])]
+    out["stored_form"] = mm.tasks_collection.find_one({"text": "renew visa"})["reminder_time"] == format_time(soon)
+    out["past_skipped"] = mm.add_item({"text": "old news", "type": "task", "reminder_time": past}).reminder_time
+    _come_due(["buy milk", "call mom", "renew visa"], past)
+    out["find"] = _texts(mm.find_items("buy"))
+
+    pages, cursor = [], None
+    while True:
+        page = mm.page_items(limit=2, cursor=cursor, fields=["text"])
+        pages.append(sorted(item["text"] for item in page["items"]))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    out["pages"] = pages
+    out["pending"] = _texts(mm.get_pending_reminders())
+
+    due = mm.get_due_reminders()
+    out["due"] = _texts(due)
+    out["claims"] = [
+        (item.text, mm.claim_reminder(item.id, item.section, owner="a") is not None,
+         mm.claim_reminder(item.id, item.section, owner="b") is not None,
+         mm.finish_reminder(item.id, item.section, owner="a"))
+        for item in sorted(due, key=lambda item: item.text)
+    ]
+    out["due_after"] = _texts(mm.get_due_reminders())
+
+    # Update -> delete -> indexed query: a claimed, then completed item must
+    # leave nothing behind in the status/claim lookups
+    mm.add_item({"text": "water the plants", "type": "task", "reminder_time": format_time(soon)})
+    _come_due(["water the plants"], past)
+    out["poll"] = _texts(mm.claim_due_reminders())
+    out["complete_polled"] = mm.complete_item("water the plants")
+    out["pending_page"] = sorted(item["text"] for item in mm.page_items(status="pending")["items"])
+    out["claim_leftovers"] = mm.tasks_collection.count_documents({"claim": {"$exists": True}})
+
+    memory = mm.load_memory()
+    memory["tasks"] = [t for t in memory["tasks"] if t["text"] != "call mom"]
+    for t in memory["tasks"]:
+        if t["text"] == "buy groceries":
+            t["text"] = "buy groceries and eggs"
+    memory["events"].append({"text": "dentist", "status": "pending", "created_at": now.isoformat()})
+    out["save_ops"] = mm.save_memory(memory)
+    out["save_again_ops"] = mm.save_memory(mm.load_memory())
+
+    # A save diffs against what its caller loaded, not the latest read: an
+    # item added after that load survives, even though another load ran since
+    stale = mm.load_memory()
+    mm.add_item({"text": "book flights", "type": "task"})
+    mm.load_memory()
+    out["stale_save_ops"] = mm.save_memory(stale)
+    out["stale_save_kept"] = "book flights" in _texts(mm.load_items()["tasks"])
+
+    # Saving a reminder that is being fired edits only the caller's fields:
+    # the claim survives and nothing internal reaches the API shape
+    mm.add_item({"text": "feed the cat", "type": "task", "reminder_time": format_time(soon)})
+    _come_due(["feed the cat"], past)
+    firing = next(item for item in mm.get_due_reminders() if item.text == "feed the cat")
+    mm.claim_reminder(firing.id, firing.section, owner="a")
+    memory = mm.load_memory()
+    out["json_internal"] = sorted({key for docs in memory.values() for doc in docs for key in doc}
+                                  & set(INTERNAL_FIELDS))
+    for t in memory["tasks"]:
+        if t["text"] == "feed the cat":
+            t["text"] = "feed the cat twice"
+    out["claimed_save_ops"] = mm.save_memory(memory)
+    out["claimed_finish"] = mm.finish_reminder(firing.id, firing.section, owner="a")
+
+    out["complete"] = mm.complete_item("buy milk")
+    out["final"] = {
+        section: sorted((d["text"], d["status"]) for d in docs)
+        for section, docs in mm.load_memory().items()
+    }
+    return out
+
+
+def _compare(label, reference, result):
+    bad = [key for key in reference if reference[key] != result.get(key)]
+    print(f"{label:<10} {'ok' if not bad else 'FAILED: ' + ', '.join(bad)}")
+    for key in bad:
+        print(f"    {key}: expected {reference[key]!r}\n    {' ' * len(key)}  got      {result.get(key)!r}")
+    return not bad
+
+
+def _timings(path, n):
+    db = LocalDatabase(path)
+    collection = db["tasks"]
+    collection.insert_many([
+        {"id": f"t{i}", "text": f"task number {i}", "status": "pending", "created_at": f"{i:08d}"}
+        for i in range(n)
+    ])
+
+    def per_call(fn, repeat):
+        start = time.perf_counter()
+        for i in range(repeat):
+            fn(i)
+        return (time.perf_counter() - start) / repeat * 1e6
+
+    rows = [
+        ("find_one by id", per_call(lambda i: collection.find_one({"id": f"t{i % n}"}, {"_id": 0}), 20000)),
+        ("update_one by id", per_call(lambda i: collection.update_one({"id": f"t{i % n}"}, {"$set": {"seen": i}}), 2000)),
+        (f"full scan ({n} docs)", per_call(lambda i: collection.count_documents({"status": "done"}), 20)),
+    ]
+    db.close()
+
+    start = time.perf_counter()
+    reopened = LocalDatabase(path)
+    durable = reopened["tasks"].count_documents({}) == n and reopened["tasks"].find_one({"id": "t0"})["seen"] >= 0
+    rows.append(("reopen + load", (time.perf_counter() - start) * 1e6))
+    reopened.close()
+
+    print(f"\n{'embedded store':<24} {'µs/op':>10}")
+    for label, micros in rows:
+        print(f"{label:<24} {micros:>10.1f}")
+    print(f"writes survive reopen: {'ok' if durable else 'FAILED'}")
+    return durable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=10000, help="documents for the timing run")
+    parser.add_argument("--mongo", help="MongoDB URL of a server to run the scenario against too")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="storage-check-")
+    backends = [
+        ("sqlite", lambda: LocalDatabase(os.path.join(workdir, "scenario.sqlite3"))),
+    ]
+    if args.mongo:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo, serverSelectionTimeoutMS=5000)
+        client.drop_database("smart_assistant_check")
+        backends.append(("mongo", lambda: client["smart_assistant_check"]))
+
+    _use(_FakeDatabase())
+    reference = _scenario()
+    ok = True
+    for label, make_db in backends:
+        _use(make_db())
+        ok = _compare(label, reference, _scenario()) and ok
+    if args.mongo:
+        client.drop_database("smart_assistant_check")
+
+    ok = _timings(os.path.join(workdir, "timing.sqlite3"), args.docs) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
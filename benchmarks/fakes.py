@@ -0,0 +1,213 @@
+"""
+Offline stand-ins used by the benchmarks: a small in-memory Mongo collection
+that understands the subset of the query language memory_manager uses (the
+matcher is shared with agent.local_store) and counts how many documents each
+call writes, plus a Groq client that never leaves the process and the old
+unclaimed reminder write the reminder benchmarks compare against.
+"""
+import copy
+import time
+from types import SimpleNamespace
+from agent import memory_manager
+from agent.local_store import Cursor as _Cursor, Result as _Result, apply_update, matches, project as _project
+
+
+class FakeCollection:
+    """
+    In-memory collection; `writes` counts documents inserted/replaced/updated/
+    deleted, `calls` counts round-trips. `latency` (seconds) is slept once per
+    call to model the network hop to a real server.
+    """
+
+    def __init__(self, latency=0.0):
+        self.docs = []
+        self.writes = 0
+        self.calls = 0
+        self.latency = latency
+        self._next_id = 0
+
+    def _roundtrip(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    # -------- reads --------
+    def find(self, query=None, projection=None):
+        self._roundtrip()
+        return _Cursor(_project(d, projection) for d in self.docs if matches(d, query))
+
+    def find_one(self, query=None, projection=None):
+        self._roundtrip()
+        for d in self.docs:
+            if matches(d, query):
+                return _project(d, projection)
+        return None
+
+    def count_documents(self, query):
+        self._roundtrip()
+        return sum(1 for d in self.docs if matches(d, query))
+
+    # -------- writes --------
+    def insert_one(self, doc):
+        self._roundtrip()
+        return _Result(inserted_ids=[self._insert(doc)])
+
+    def insert_many(self, docs, ordered=True):
+        self._roundtrip()
+        return _Result(inserted_ids=[self._insert(d) for d in docs])
+
+    def delete_one(self, query):
+        self._roundtrip()
+        return self._delete_one(query)
+
+    def delete_many(self, query):
+        self._roundtrip()
+        keep = [d for d in self.docs if not matches(d, query)]
+        deleted = len(self.docs) - len(keep)
+        self.docs = keep
+        self.writes += deleted
+        return _Result(deleted=deleted)
+
+    def replace_one(self, query, doc, upsert=False):
+        self._roundtrip()
+        return self._replace_one(query, doc, upsert)
+
+    def update_one(self, query, update, upsert=False):
+        self._roundtrip()
+        return self._update(query, update, many=False, upsert=upsert)
+
+    def update_many(self, query, update):
+        self._roundtrip()
+        return self._update(query, update, many=True)
+
+    def find_one_and_update(self, query, update, projection=None, return_document=False, upsert=False, **kwargs):
+        # return_document: False/ReturnDocument.BEFORE or True/ReturnDocument.AFTER
+        self._roundtrip()
+        for d in self.docs:
+            if matches(d, query):
+                before = _project(d, projection)
+                self._apply(d, update)
+                self.writes += 1
+                return _project(d, projection) if return_document else before
+        if upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$")}
+            self._apply(doc, update)
+            self._insert(doc)
+            return _project(doc, projection) if return_document else None
+        return None
+
+    def bulk_write(self, ops, ordered=True):
+        self._roundtrip()
+        for op in ops:
+            kind = type(op).__name__
+            doc = getattr(op, "_doc", None)
+            if kind == "ReplaceOne":
+                self._replace_one(op._filter, doc, op._upsert)
+            elif kind == "DeleteOne":
+                self._delete_one(op._filter)
+            elif kind == "UpdateOne":
+                self._update(op._filter, doc, many=False, upsert=op._upsert)
+            elif kind == "InsertOne":
+                self._insert(doc)
+        return _Result()
+
+    # -------- internals (no round-trip) --------
+    def _insert(self, doc):
+        self._next_id += 1
+        doc.setdefault("_id", self._next_id)
+        self.docs.append(copy.copy(doc))
+        self.writes += 1
+        return doc["_id"]
+
+    def _delete_one(self, query):
+        for i, d in enumerate(self.docs):
+            if matches(d, query):
+                del self.docs[i]
+                self.writes += 1
+                return _Result(deleted=1)
+        return _Result()
+
+    def _replace_one(self, query, doc, upsert):
+        for i, d in enumerate(self.docs):
+            if matches(d, query):
+                self.docs[i] = dict(doc, _id=d["_id"])
+                self.writes += 1
+                return _Result(matched=1, modified=1)
+        if upsert:
+            self._insert(dict(doc))
+        return _Result()
+
+    def _update(self, query, update, many, upsert=False):
+        n = 0
+        for d in self.docs:
+            if matches(d, query):
+                self._apply(d, update)
+                n += 1
+                if not many:
+                    break
+        self.writes += n
+        if not n and upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$")}
+            self._apply(doc, update)
+            return _Result(upserted_id=self._insert(doc))
+        return _Result(matched=n, modified=n)
+
+    @staticmethod
+    def _apply(doc, update):
+        apply_update(doc, update)
+
+
+class FakeGroq:
+    """
+    Deterministic chat.completions client. Keyword-extraction prompts get the
+    first words of the message back; everything else is answered with
+    `chat_reply`. `latency` (seconds) is slept per call to model the API
+    round-trip, and `token_latency` per word of the reply to model
+    generation. With stream=True the reply comes back one word per chunk,
+    as the real client's delta chunks do.
+    """
+
+    def __init__(self, latency=0.0, token_latency=0.0, chat_reply="chat"):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.chat_reply = chat_reply
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def reply(self, messages):
+        """The answer to a chat.completions messages list (also served by benchmarks.loadtest)."""
+        system, user = messages[0]["content"], messages[-1]["content"]
+        return " ".join(user.split()[:4]) if system.startswith("Extract") else self.chat_reply
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        content = self.reply(messages)
+        if stream:
+            return self._stream(content)
+        if self.latency or self.token_latency:
+            time.sleep(self.latency + self.token_latency * len(content.split()))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _stream(self, content):
+        if self.latency:
+            time.sleep(self.latency)
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            text = word if i == len(words) - 1 else word + " "
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def mark_notified(item_id, section):
+    """
+    The fire path before reminder claims: flag one reminder notified with a
+    single targeted update, whichever worker gets there.
+    """
+    result = memory_manager._collection_for(section).update_one(
+        {"id": item_id, "status": {"$ne": "completed"}},
+        {"$set": {"status": "notified"}}
+    )
+    if result.modified_count:
+        memory_manager._bump_version()
+    return result.modified_count > 0
@@ -0,0 +1,485 @@
+"""
+Offline load test of the deployed app: the real server process(es) under
+gunicorn (as in render.yaml) or uvicorn, talking to a fake Groq server and
+a local store, driven by an async load generator.
+
+Each configuration (workers x PIPELINE_MODE) gets a fresh server. Setup:
+- Storage is the embedded SQLite store (STORAGE_BACKEND=sqlite) in a
+  scratch directory. With --mongo URL it is a scratch database on that
+  server, dropped afterwards.
+- GROQ_BASE_URL points at a fake OpenAI-compatible server in its own
+  process. It answers after --groq-ms and streams one word per --token-ms.
+- NOTIFY_BUS=unix, so broadcasts reach subscribers on every worker.
+- The store is seeded through /send/batch before the clock starts. Each
+  seeded task or event costs a Groq keyword call, so --seed is kept small
+  and progress is printed as the batches land.
+
+During the run:
+- --users HTTP users loop over the --mix of /send, /send/stream, /memory
+  and /check_reminders.
+- --subscribers WebSocket clients stay connected to /ws.
+- A broadcaster calls /test-popup every --broadcast-ms.
+- The report gives throughput, p50/p95/p99 latency and errors per endpoint,
+  WebSocket delivery rate and broadcast lag, and a side-by-side summary.
+
+The generator is a single process; if its CPU is saturated, the numbers
+measure it rather than the server.
+
+    python -m benchmarks.loadtest --workers 1,2,4 --modes thread,process --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_LINE = "Application startup complete"
+STARTUP_TIMEOUT = 60
+POPUP_TITLE = "Test Notification"
+
+MESSAGES = [
+    "buy the groceries {i} tomorrow at 5pm",
+    "submit report {i}",
+    "design conference {i} on 5th November 3:30pm",
+    "birthday party {i} 12 december",
+    "dinner with priya {i} on friday",
+    "hello there number {i}",
+    "tell me something about topic {i}",
+    "report {i} done",
+]
+SEED_BATCH = 50
+CHAT_REPLY = "That sounds like a general question rather than a task or an event, happy to chat."
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+# ======================================================
+# 🤖 FAKE GROQ SERVER (its own process)
+# ======================================================
+async def _serve_groq(port, latency, token_latency):
+    from benchmarks.fakes import FakeGroq
+    replies = FakeGroq(chat_reply=CHAT_REPLY)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(re.search(rb"(?i)content-length:\s*(\d+)", head).group(1))
+                request = json.loads(await reader.readexactly(length))
+                content = replies.reply(request["messages"])
+                await asyncio.sleep(latency)
+                if request.get("stream"):
+                    await _stream(writer, request["model"], content, token_latency)
+                else:
+                    await asyncio.sleep(token_latency * len(content.split()))
+                    body = json.dumps(_completion(request["model"], content)).encode()
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                 b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+    print("ready", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def _completion(model, content):
+    return {
+        "id": "chatcmpl-loadtest", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+async def _stream(writer, model, content, token_latency):
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        chunk = {"id": "chatcmpl-loadtest", "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": model, "choices": [{"index": 0, "delta": {"content": word if i == len(words) - 1 else word + " "},
+                                              "finish_reason": None}]}
+        await asyncio.sleep(token_latency)
+        _chunk(writer, b"data: " + json.dumps(chunk).encode() + b"\n\n")
+        await writer.drain()
+    _chunk(writer, b"data: [DONE]\n\n")
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _chunk(writer, data):
+    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+
+# ======================================================
+# 🚀 PROCESSES
+# ======================================================
+class _Process:
+    """A child process whose combined output is drained (and kept) in the background."""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.lines = []
+        self.ready = 0
+        self.forced = False
+        self.reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                return
+            text = line.decode(errors="replace").rstrip()
+            self.lines = self.lines[-200:] + [text]
+            if READY_LINE in text or text == "ready":
+                self.ready += 1
+
+    async def wait_ready(self, count, what):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while self.ready < count:
+            if self.proc.returncode is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"{what} did not start:\n" + "\n".join(self.lines[-30:]))
+            await asyncio.sleep(0.05)
+
+    async def stop(self):
+        """SIGTERM, then SIGKILL after 15 s, sent to the whole process group (pool workers included)."""
+        if self.proc.returncode is None:
+            os.killpg(self.proc.pid, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self.proc.wait(), 15)
+            except asyncio.TimeoutError:
+                self.forced = True
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)   # anything the leader left behind
+        except ProcessLookupError:
+            pass
+        await self.proc.wait()
+        await self.reader
+
+
+async def _spawn(args, env=None):
+    proc = await asyncio.create_subprocess_exec(
+        *args, cwd=BASE_DIR, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        start_new_session=True,
+    )
+    return _Process(proc)
+
+
+def _server_command(server, workers, port):
+    if server == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "app:app", "-k", "uvicorn.workers.UvicornWorker",
+                "-w", str(workers), "-b", f"127.0.0.1:{port}", "--log-level", "info"]
+    return [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "info", "--no-access-log"]
+
+
+# ======================================================
+# 📈 LOAD
+# ======================================================
+class _Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def ok(self, name, seconds):
+        self.latencies[name].append(seconds)
+
+    def fail(self, name, error):
+        self.errors[name] += 1
+        self.error_samples.setdefault(name, str(error)[:120])
+
+
+async def _call(client, recorder, op, message):
+    start = time.perf_counter()
+    try:
+        if op == "send":
+            response = await client.post("/send", json={"message": message})
+            response.raise_for_status()
+        elif op == "send_stream":
+            first = None
+            async with client.stream("POST", "/send/stream", json={"message": message}) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if first is None:
+                        first = time.perf_counter() - start
+                    if line == "event: error":
+                        raise RuntimeError("error event")
+            recorder.ok("send_stream (first event)", first)
+        elif op == "memory":
+            (await client.get("/memory")).raise_for_status()
+        elif op == "check_reminders":
+            (await client.get("/check_reminders")).raise_for_status()
+    except Exception as e:
+        recorder.fail(op, e)
+        return
+    recorder.ok(op, time.perf_counter() - start)
+
+
+async def _user(client, recorder, ops, weights, counter, rng, stop_at, think):
+    while time.perf_counter() < stop_at:
+        op = rng.choices(ops, weights)[0]
+        counter[0] += 1
+        message = rng.choice(MESSAGES).format(i=f"u{counter[0]}")
+        await _call(client, recorder, op, message)
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def _subscriber(url, received, connected, stop):
+    import websockets
+    try:
+        async with websockets.connect(url, max_size=None, open_timeout=30) as ws:
+            connected.append(ws)
+            while not stop.is_set():
+                try:
+                    text = await asyncio.wait_for(ws.recv(), 0.5)
+                except asyncio.TimeoutError:
+                    continue
+                if json.loads(text).get("title") == POPUP_TITLE:
+                    received.append(time.perf_counter())
+    except Exception:
+        pass
+
+
+async def _broadcaster(client, sent, recorder, interval, stop_at):
+    while time.perf_counter() < stop_at:
+        sent.append(time.perf_counter())
+        start = time.perf_counter()
+        try:
+            (await client.get("/test-popup")).raise_for_status()
+            recorder.ok("test-popup", time.perf_counter() - start)
+        except Exception as e:
+            sent.pop()
+            recorder.fail("test-popup", e)
+        await asyncio.sleep(interval)
+
+
+async def _seed(client, count):
+    rng = random.Random(3)
+    started = time.perf_counter()
+    for start in range(0, count, SEED_BATCH):
+        batch = [rng.choice(MESSAGES[:5]).format(i=f"seed{start + i}")
+                 for i in range(min(SEED_BATCH, count - start))]
+        (await client.post("/send/batch", json={"messages": batch}, timeout=300)).raise_for_status()
+        print(f"  seeded {start + len(batch)}/{count} items ({time.perf_counter() - started:.1f}s)", flush=True)
+
+
+async def _run(args, workers, mode):
+    import httpx
+
+    scratch = tempfile.mkdtemp(prefix="loadtest-")
+    groq_port, port = _free_port(), _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        GROQ_API_KEY="offline-loadtest",
+        GROQ_BASE_URL=f"http://127.0.0.1:{groq_port}",
+        PIPELINE_MODE=mode,
+        NOTIFY_BUS="unix",
+        NOTIFY_BUS_SOCKET=os.path.join(scratch, "bus.sock"),
+        PYTHONUNBUFFERED="1",
+    )
+    if args.mongo:
+        env.update(STORAGE_BACKEND="mongo", MONGO_URL=args.mongo, MONGO_DB_NAME="smart_assistant_loadtest")
+    else:
+        env.update(STORAGE_BACKEND="sqlite", LOCAL_DB_FILE=os.path.join(scratch, "store.sqlite3"))
+
+    groq = await _spawn([sys.executable, "-m", "benchmarks.loadtest", "--fake-groq", str(groq_port),
+                         str(args.groq_ms / 1000), str(args.token_ms / 1000)])
+    server = None
+    try:
+        await groq.wait_ready(1, "fake Groq server")
+        server = await _spawn(_server_command(args.server, workers, port), env)
+        await server.wait_ready(workers, f"{args.server} ({workers} workers)")
+
+        limits = httpx.Limits(max_connections=args.users + 8, max_keepalive_connections=args.users + 8)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await _seed(client, args.seed)
+
+            recorder = _Recorder()
+            stop = asyncio.Event()
+            received = [[] for _ in range(args.subscribers)]
+            connected = []
+            subscribers = [asyncio.create_task(_subscriber(f"ws://127.0.0.1:{port}/ws", received[i], connected, stop))
+                           for i in range(args.subscribers)]
+            deadline = time.monotonic() + 30
+            while len(connected) < args.subscribers and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+            ops, weights = zip(*args.mix)
+            rng = random.Random(7)
+            counter = [0]
+            start = time.perf_counter()
+            stop_at = start + args.duration
+            sent = []
+            tasks = [_user(client, recorder, ops, weights, counter, random.Random(rng.random()), stop_at, args.think_ms / 1000)
+                     for _ in range(args.users)]
+            if args.subscribers:
+                tasks.append(_broadcaster(client, sent, recorder, args.broadcast_ms / 1000, stop_at))
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(1.0)   # let the last broadcasts land
+            stop.set()
+            await asyncio.gather(*subscribers)
+    finally:
+        if server is not None:
+            await server.stop()
+            if server.forced:
+                print("⚠ server did not shut down within 15 s; killed. Last output:\n  " + "\n  ".join(server.lines[-15:]))
+        await groq.stop()
+        if args.mongo:
+            from pymongo import MongoClient
+            MongoClient(args.mongo, serverSelectionTimeoutMS=5000).drop_database("smart_assistant_loadtest")
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    lags = []
+    for times in received:
+        lags.extend(recv - sent_at for recv, sent_at in zip(times, sent))
+    expected = len(sent) * args.subscribers
+    return {
+        "workers": workers,
+        "mode": mode,
+        "elapsed": elapsed,
+        "endpoints": {
+            name: {
+                "requests": len(samples) + recorder.errors[name],
+                "errors": recorder.errors[name],
+                "rps": len(samples) / elapsed,
+                "p50": _percentile(sorted(samples), .50),
+                "p95": _percentile(sorted(samples), .95),
+                "p99": _percentile(sorted(samples), .99),
+                "error_sample": recorder.error_samples.get(name),
+            }
+            for name, samples in sorted({**{n: [] for n in recorder.errors}, **recorder.latencies}.items())
+        },
+        "websocket": {
+            "subscribers": args.subscribers,
+            "connected": len(connected),
+            "broadcasts": len(sent),
+            "delivered": sum(len(times) for times in received),
+            "expected": expected,
+            "lag_p50": _percentile(sorted(lags), .50),
+            "lag_p95": _percentile(sorted(lags), .95),
+            "lag_p99": _percentile(sorted(lags), .99),
+            "lag_max": max(lags) if lags else float("nan"),
+        },
+    }
+
+
+# ======================================================
+# 🧾 REPORT
+# ======================================================
+def _report(result):
+    print(f"\n▶ {result['workers']} worker(s), PIPELINE_MODE={result['mode']}, {result['elapsed']:.1f}s")
+    print(f"  {'endpoint':<26} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, e in result["endpoints"].items():
+        error_rate = f"{e['errors'] / e['requests']:.1%}" if e["requests"] else "-"
+        print(f"  {name:<26} {e['requests']:>8} {error_rate:>7} {e['rps']:>8.1f} "
+              f"{e['p50'] * 1000:>8.1f} {e['p95'] * 1000:>8.1f} {e['p99'] * 1000:>8.1f}")
+        if e["error_sample"]:
+            print(f"    first error: {e['error_sample']}")
+    ws = result["websocket"]
+    if ws["subscribers"]:
+        rate = ws["delivered"] / ws["expected"] if ws["expected"] else float("nan")
+        print(f"  /ws: {ws['connected']}/{ws['subscribers']} connected, {ws['broadcasts']} broadcasts, "
+              f"{rate:.1%} delivered; lag p50 {ws['lag_p50'] * 1000:.1f} ms, p95 {ws['lag_p95'] * 1000:.1f} ms, "
+              f"p99 {ws['lag_p99'] * 1000:.1f} ms, max {ws['lag_max'] * 1000:.1f} ms")
+
+
+def _summary(results):
+    print(f"\n{'workers':>7} {'mode':<8} {'total req/s':>11} {'errors':>7} {'send p50':>9} {'send p99':>9} "
+          f"{'ws delivered':>12} {'ws lag p99':>10}")
+    for r in results:
+        endpoints = r["endpoints"]
+        total = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        send = endpoints.get("send", {})
+        ws = r["websocket"]
+        delivered = f"{ws['delivered'] / ws['expected']:.1%}" if ws["expected"] else "-"
+        print(f"{r['workers']:>7} {r['mode']:<8} {(total - errors) / r['elapsed']:>11.1f} "
+              f"{(errors / total if total else 0):>7.1%} {send.get('p50', float('nan')) * 1000:>7.0f}ms "
+              f"{send.get('p99', float('nan')) * 1000:>7.0f}ms {delivered:>12} {ws['lag_p99'] * 1000:>8.1f}ms")
+
+
+def _mix(text):
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("send", "send_stream", "memory", "check_reminders"):
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--fake-groq":
+        port, latency, token_latency = int(sys.argv[2]), float(sys.argv[3]), float(sys.argv[4])
+        asyncio.run(_serve_groq(port, latency, token_latency))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="1", help="comma-separated worker counts to compare")
+    parser.add_argument("--modes", default="thread", help="comma-separated PIPELINE_MODEs to compare")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto")
+    parser.add_argument("--users", type=int, default=20, help="concurrent HTTP users")
+    parser.add_argument("--subscribers", type=int, default=50, help="WebSocket clients on /ws")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of load per configuration")
+    parser.add_argument("--mix", type=_mix, default=_mix("send=5,send_stream=1,memory=2,check_reminders=2"),
+                        help="operation weights, e.g. send=5,memory=2")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's requests")
+    parser.add_argument("--broadcast-ms", type=float, default=250, help="interval between /test-popup broadcasts")
+    parser.add_argument("--groq-ms", type=float, default=300, help="fake Groq time to first token")
+    parser.add_argument("--token-ms", type=float, default=10, help="fake Groq time per streamed word")
+    parser.add_argument("--seed", type=int, default=200, help="items stored before the run")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout (s)")
+    parser.add_argument("--mongo", help="MongoDB URL to use instead of the embedded store")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.server == "auto":
+        args.server = "gunicorn" if _importable("gunicorn") else "uvicorn"
+    configs = [(int(w), m.strip()) for w in args.workers.split(",") for m in args.modes.split(",")]
+    print(f"{args.server}, {args.users} users, {args.subscribers} subscribers, {args.duration:.0f}s per run, "
+          f"Groq stub {args.groq_ms:.0f} ms + {args.token_ms:.0f} ms/word, "
+          f"{'mongo' if args.mongo else 'sqlite'} store, {os.cpu_count()} CPU(s)")
+
+    results = []
+    for workers, mode in configs:
+        result = asyncio.run(_run(args, workers, mode))
+        _report(result)
+        results.append(result)
+    if len(results) > 1:
+        _summary(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def _importable(name):
+    import importlib.util
+    return importlib.util.find_spec(name) is not None
+
+
+if __name__ == "__main__":
+    main()
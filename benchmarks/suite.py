@@ -0,0 +1,368 @@
+"""
+Offline benchmark suite for the agent hot paths.
+
+Every path runs against FakeCollection and FakeGroq on synthetic, seeded
+datasets, so two runs on the same machine see identical work:
+
+    process_message          mixed task / event / completion / chat messages
+    extract_keywords         the same message mix
+    complete_item            free-text completion of stored items
+    extract_time             dated and undated messages (distinct per size)
+    send_reminders           boot seeding + firing due reminders
+    broadcast_notification   fan-out to N connected WebSocket clients
+
+Size is the number of stored items (number of clients for the broadcast).
+Each path reports throughput and p50/p99 latency per size. Results are
+compared with benchmarks/baseline.json; a slowdown beyond the tolerance
+fails the run with exit code 1.
+
+    python -m benchmarks.suite                          # 10², 10³, 10⁴
+    python -m benchmarks.suite --sizes 100,1000,10000,100000
+    python -m benchmarks.suite --only extract_time,complete_item
+    python -m benchmarks.suite --update-baseline
+
+Baselines are machine-specific: regenerate them with --update-baseline on
+the machine that runs the comparison.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+
+from agent import broadcasting, date_parser_helper, llm_cache, memory_manager, notify
+from agent.date_parser_helper import KOLKATA, extract_time, format_time
+from agent.llm_agent import extract_keywords, process_message
+from agent.scheduler import ReminderScheduler, reminder_scheduler
+from benchmarks.fakes import FakeCollection, FakeGroq
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [100, 1_000, 10_000]
+OPS = 200              # timed operations per path and size
+WARMUP = 5             # untimed operations first (imports, regex compilation)
+BROADCAST_BUDGET = 200_000   # client-sends per broadcast run
+SEED = 1234
+NOISE_FLOOR_MS = 0.25  # p50 shifts smaller than this are scheduler jitter, not regressions
+# Wednesday, 10:00 Asia/Kolkata
+REFERENCE = datetime(2025, 1, 15, 10, 0)
+
+_VERBS = ["buy", "submit", "clean", "send", "study", "prepare", "finish"]
+_NOUNS = ["groceries", "report", "garage", "invoice", "slides", "notes", "assignment", "kitchen", "budget"]
+_EVENTS = ["team meeting", "dentist appointment", "birthday party", "design conference", "yoga class"]
+_WHEN = ["tomorrow at 5pm", "on friday at 3pm", "next monday 9am", "in 2 hours", "at 10:30", "5th November 3:30pm", ""]
+_CHAT = ["hello how are you", "tell me a joke", "what's the weather like", "thanks a lot", "good morning"]
+
+
+# ======================================================
+# 🧪 SYNTHETIC DATA
+# ======================================================
+def _item_text(rng, i):
+    if rng.random() < 0.6:
+        return f"{rng.choice(_VERBS)} {rng.choice(_NOUNS)} {i}"
+    return f"{rng.choice(_EVENTS)} {i}"
+
+
+def _dataset(size, rng):
+    """`size` stored items split between tasks and events."""
+    tasks, events = [], []
+    for i in range(size):
+        text = _item_text(rng, i)
+        doc = {
+            "id": f"item{i:06d}",
+            "text": text,
+            "status": "pending",
+            "source": "regex",
+            "created_at": (REFERENCE - timedelta(minutes=size - i)).isoformat(),
+        }
+        (events if text.split()[0] in {e.split()[0] for e in _EVENTS} else tasks).append(doc)
+    return tasks, events
+
+
+def _message(rng, i, stored):
+    """One message of the mix: 35% task, 25% event, 20% completion, 20% chat."""
+    roll = rng.random()
+    if roll < 0.35:
+        return f"{rng.choice(_VERBS)} the {rng.choice(_NOUNS)} {i} {rng.choice(_WHEN)}".strip()
+    if roll < 0.60:
+        return f"{rng.choice(_EVENTS)} {i} {rng.choice(_WHEN)}".strip()
+    if roll < 0.80 and stored:
+        return f"{rng.choice(stored)['text']} done"
+    return f"{rng.choice(_CHAT)} {i}"
+
+
+def _messages(size, rng, stored):
+    return [_message(rng, i, stored) for i in range(size)]
+
+
+def _reset_store(size, rng, latency=0.0):
+    """Fresh fake collections holding a seeded dataset; clears derived state."""
+    tasks, events = _dataset(size, rng)
+    memory_manager.tasks_collection = FakeCollection(latency)
+    memory_manager.events_collection = FakeCollection(latency)
+    memory_manager.tasks_collection.insert_many(tasks)
+    memory_manager.events_collection.insert_many(events)
+    memory_manager._bump_version()
+    memory_manager._text_index_ready = False
+    date_parser_helper._date_cache.clear()
+    llm_cache.completion_cache.clear()
+    return tasks + events
+
+
+# ======================================================
+# ⏱️ MEASUREMENT
+# ======================================================
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _summary(latencies, wall):
+    return {
+        "ops": len(latencies),
+        "throughput": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 4),
+    }
+
+
+def _time_calls(fn, args):
+    for a in args[:WARMUP]:
+        fn(a)
+    latencies = []
+    start = time.perf_counter()
+    for a in args[WARMUP:]:
+        t0 = time.perf_counter()
+        fn(a)
+        latencies.append(time.perf_counter() - t0)
+    return _summary(latencies, time.perf_counter() - start)
+
+
+# ======================================================
+# 🛤️ PATHS
+# ======================================================
+def bench_process_message(size, rng):
+    stored = _reset_store(size, rng)
+    return _time_calls(process_message, _messages(OPS + WARMUP, rng, stored))
+
+
+def bench_extract_keywords(size, rng):
+    stored = _reset_store(size, rng)
+    return _time_calls(extract_keywords, _messages(OPS + WARMUP, rng, stored))
+
+
+def bench_complete_item(size, rng):
+    stored = _reset_store(size, rng)
+    ops = min(OPS, size // 2)
+    targets = rng.sample(stored, ops + WARMUP) if size >= 2 * (ops + WARMUP) else stored[:ops + WARMUP]
+    return _time_calls(memory_manager.complete_item, [f"{doc['text']} done" for doc in targets])
+
+
+def bench_extract_time(size, rng):
+    # `size` distinct messages: beyond DATE_CACHE_SIZE the memo stops helping.
+    extract_time("design conference 5th November 3:30pm", now=REFERENCE)  # load dateparser search
+    date_parser_helper._date_cache.clear()
+    pool = _messages(size, rng, [])
+    return _time_calls(lambda text: extract_time(text, now=REFERENCE), [rng.choice(pool) for _ in range(OPS + WARMUP)])
+
+
+def bench_send_reminders(size, rng):
+    """
+    `size` stored reminders, OPS of them already due. Latency is per fired
+    reminder (claim_reminder + broadcast + finish_reminder); throughput
+    counts reminders fired per second of wall time, boot seeding included.
+    """
+    stored = _reset_store(size, rng)
+    now = datetime.now(KOLKATA).replace(tzinfo=None)
+    due = set(range(min(OPS, size)))
+    for i, doc in enumerate(stored):
+        when = now - timedelta(minutes=1) if i in due else now + timedelta(days=30)
+        doc["reminder_time"] = format_time(when)
+    by_id = {doc["id"]: doc["reminder_time"] for doc in stored}
+    for collection in (memory_manager.tasks_collection, memory_manager.events_collection):
+        for doc in collection.docs:
+            doc["reminder_time"] = by_id[doc["id"]]
+
+    scheduler = ReminderScheduler()
+    memory_manager.reminder_scheduler = notify.reminder_scheduler = scheduler
+    fire = notify._fire_reminder
+    latencies = []
+    finished = None
+
+    async def timed_fire(item_id, payload):
+        t0 = time.perf_counter()
+        await fire(item_id, payload)
+        latencies.append(time.perf_counter() - t0)
+        if len(latencies) == len(due):
+            finished.set()
+
+    async def run():
+        nonlocal finished
+        finished = asyncio.Event()
+        task = asyncio.create_task(notify.send_reminders(None))
+        await asyncio.wait_for(finished.wait(), 300)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    notify._fire_reminder = timed_fire
+    try:
+        start = time.perf_counter()
+        asyncio.run(run())
+        wall = time.perf_counter() - start
+    finally:
+        notify._fire_reminder = fire
+        memory_manager.reminder_scheduler = notify.reminder_scheduler = reminder_scheduler
+    return _summary(latencies, wall)
+
+
+class _FakeSocket:
+    def __init__(self, counter):
+        self.counter = counter
+
+    async def send_text(self, text):
+        self.counter.tick()
+
+    async def close(self, code=1000):
+        pass
+
+
+class _Counter:
+    def __init__(self):
+        self.remaining = 0
+        self.done = None
+
+    def tick(self):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.done.set()
+
+
+def bench_broadcast_notification(size, rng):
+    """Latency from broadcast_notification() until every client has sent it."""
+    ops = max(10, min(OPS, BROADCAST_BUDGET // size))
+    latencies = []
+
+    async def run():
+        counter = _Counter()
+        broadcasting.connected_clients.clear()
+        for _ in range(size):
+            await broadcasting.add_client(_FakeSocket(counter))
+        start = time.perf_counter()
+        for i in range(ops + WARMUP):
+            counter.remaining, counter.done = size, asyncio.Event()
+            t0 = time.perf_counter()
+            await broadcasting.broadcast_notification("Reminder", f"message {i}")
+            await counter.done.wait()
+            if i >= WARMUP:
+                latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - start
+        for ws in list(broadcasting.connected_clients):
+            await broadcasting.remove_client(ws)
+        return wall
+
+    wall = asyncio.run(run())
+    return _summary(latencies, wall)
+
+
+PATHS = {
+    "process_message": bench_process_message,
+    "extract_keywords": bench_extract_keywords,
+    "complete_item": bench_complete_item,
+    "extract_time": bench_extract_time,
+    "send_reminders": bench_send_reminders,
+    "broadcast_notification": bench_broadcast_notification,
+}
+
+
+# ======================================================
+# 📊 BASELINE COMPARISON
+# ======================================================
+def _load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def _save_baseline(path, results):
+    payload = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "ops": OPS,
+        "seed": SEED,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _regressions(key, result, baseline, tolerance):
+    base = baseline.get(key)
+    if not base:
+        return []
+    problems = []
+    if result["p50_ms"] > base["p50_ms"] * (1 + tolerance) and result["p50_ms"] - base["p50_ms"] > NOISE_FLOOR_MS:
+        problems.append(f"p50 {base['p50_ms']:.3f} → {result['p50_ms']:.3f} ms")
+    if result["throughput"] < base["throughput"] / (1 + tolerance):
+        problems.append(f"throughput {base['throughput']:.0f} → {result['throughput']:.0f}/s")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--only", default="", help="comma-separated subset of: " + ", ".join(PATHS))
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("BENCH_TOLERANCE", "0.5")),
+                        help="allowed slowdown before failing, as a fraction (default 0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    names = [n for n in args.only.split(",") if n] or list(PATHS)
+    unknown = set(names) - set(PATHS)
+    if unknown:
+        parser.error("unknown path(s): " + ", ".join(sorted(unknown)))
+
+    llm_cache.set_client(FakeGroq())
+    baseline = _load_baseline(args.baseline)
+    results, failures = {}, []
+
+    print(f"{'path':<24} {'size':>7} {'ops':>5} {'ops/s':>11} {'p50 ms':>9} {'p99 ms':>9}  vs baseline")
+    for name in names:
+        for size in sizes:
+            rng = random.Random(f"{SEED}:{name}:{size}")
+            # The paths print their usual progress lines; keep them out of the table.
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                result = PATHS[name](size, rng)
+            key = f"{name}@{size}"
+            results[key] = result
+            problems = _regressions(key, result, baseline, args.tolerance)
+            failures.extend(f"{key}: {p}" for p in problems)
+            status = "REGRESSED" if problems else ("ok" if key in baseline else "new")
+            print(f"{name:<24} {size:>7} {result['ops']:>5} {result['throughput']:>11.1f} "
+                  f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f}  {status}")
+
+    if args.update_baseline:
+        merged = dict(baseline, **results)
+        _save_baseline(args.baseline, merged)
+        print(f"✅ Baseline written to {args.baseline}")
+        return 0
+
+    if failures:
+        print(f"⚠ {len(failures)} regression(s) beyond {args.tolerance:.0%}:")
+        for failure in failures:
+            print("  " + failure)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())